@@ -29,6 +29,7 @@ import sys
 import neopixel
 
 import adafruit_vl6180x
+from framebuffer import FrameBuffer
 
 # TODO remove DocStrings to save memory (""" comments at firstline of def)
 # CONSTANTS
@@ -91,7 +92,7 @@ i2c = busio.I2C(board.SCL, board.SDA)
 sensorX = adafruit_vl6180x.VL6180X(i2c)
 sensorY = adafruit_vl6180x.VL6180X(i2c,0x69)
 pixels = neopixel.NeoPixel(PIXEL_PIN, PIXEL_COUNT, bpp=PIXEL_BYTES, brightness=PIXEL_BRIGHTNESS, auto_write=PIXEL_AUTO_WRITE, pixel_order=PIXEL_ORDER)
-gamma_table = [int((i / 255) ** 2.2 * 255 + 0.5) for i in range(256)] # poplulate a pre-calculated table for gamma correction to avoid run-time floating-point math
+frame = FrameBuffer(PIXEL_COUNT, PIXEL_ORDER, pixels.pin)    # wire-order buffer written straight to the strip
 
 pixels_np = np.array(pixels, dtype=np.int16)  # numpy working copy of pixel data
 fire_fade_by = np.array( (-3,-3,-3), dtype=np.int16 )  # amount to fade by
@@ -289,10 +290,6 @@ def rgb_fade(rgb_tuple, fade_factor):
     b = b * fade_factor
     return (int(r), int(g), int(b)) # return integers, not floats
 
-def gamma_correct(rgb_tuple):
-    r, g, b = rgb_tuple
-    return (gamma_table[r], gamma_table[g], gamma_table[b])
-
 def scale_sensor_value(raw_value, input_min, input_max):
     if input_max == input_min:
         return 0
@@ -315,9 +312,6 @@ def no_interaction(elapsed_seconds):
     last_x = x
     last_y = y
     inputs_stable = stable_count >= REQUIRED_STABLE_READINGS
-
-    # TODO move/delete print
-    print(f" | Timeout: {interaction_timeout_reached} | Stable: {inputs_stable} ({stable_count})     ", end="")
     return interaction_timeout_reached and inputs_stable
 
 def grab_attention():
@@ -394,8 +388,8 @@ def fire():
     pixels_np[:] = np.clip(pixels_np, 0, 255)
 
     # Show results
-    pixels[:] = pixels_np.tolist()
-    pixels.show()
+    frame.load(pixels_np)
+    frame.show()
 
 
 # INITIALIZATION
@@ -453,8 +447,8 @@ try:                                                         # prepare to catch
         x_final = x_inverted / 255
    
         #color = rgb_fade(MAX_RED, x_final)                      # fade based on proximity
-        #pixels.fill(gamma_correct(color))                       # apply gamma correction to better present human-perceivable differences
-        #pixels.show()
+        #frame.fill(color)                                       # gamma correction belongs to a framebuffer.OutputStage
+        #frame.show()
 
         fire()
         
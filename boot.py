@@ -0,0 +1,29 @@
+# boot.py
+
+import board
+import digitalio
+import os
+import storage
+import usb_cdc
+
+# Second USB serial port for binary telemetry (see telemetry.py). The REPL
+# console stays where it was.
+usb_cdc.enable(console=True, data=True)
+
+# CIRCUITPY stays writable from the computer, for editing, unless the button
+# is held while the board starts or a file named log_to_flash is on the
+# drive. Then code.py gets write access for its event log and crash
+# traceback, and the drive is read-only over USB (delete log_to_flash from
+# the REPL, or restart without the button, to edit again). Otherwise the
+# event log stays in RAM.
+button = digitalio.DigitalInOut(board.D0)
+button.direction = digitalio.Direction.INPUT
+button.pull = digitalio.Pull.DOWN
+try:
+    os.stat("/log_to_flash")
+    log_to_flash = True
+except OSError:
+    log_to_flash = False
+if button.value or log_to_flash:
+    storage.remount("/", readonly=False)
+button.deinit()
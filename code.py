@@ -26,6 +26,19 @@ try:
     import sys
     import neopixel
     import digitalio
+    import asyncio
+    from framebuffer import FrameBuffer, MultiFrameBuffer, OutputStage
+    from power import PowerLimiter
+    from sensors import RangeSensor, SensorArray
+    from helix import Helix
+    from playlist import register, Playlist, Sequencer
+    from palettes import PaletteCache
+    import framecache
+    from governor import FrameGovernor
+    from filters import RangeFilter, PresenceDetector, SampleHistory, ticks_ms
+    import profiler
+    from telemetry import Telemetry, FLAG_PRESENT, FLAG_ATTRACT, FLAG_BUTTON
+    import eventlog
 
     import adafruit_vl6180x
     from colors import *
@@ -42,12 +55,20 @@ except Exception as e:
 # CONSTANTS
 PIXEL_PIN = board.A1
 PIXEL_BRIGHTNESS = 1.0
+PIXEL_GAMMA = 2.2
+PIXEL_DITHER = True                                             # 8.8 frames, temporally dithered to 8 bits on output
+PIXEL_DITHER_FILL = False                                       # dither the interactive fill too: finer dim levels,
+                                                                # but a still color is then resent every frame
+POWER_BUDGET_MA = 4000                                          # what the 5 V supply can deliver to the strip
+POWER_CHANNEL_MA = (20.0, 20.0, 20.0)                           # WS2812B draw per channel at full R, G, B
+POWER_IDLE_MA = 1.0                                             # per pixel, even when dark
 PIXEL_BYTES = 3
 PIXEL_AUTO_WRITE = False
 PIXEL_ORDER = neopixel.GRB
 PIXEL_COUNT = 250
+PIXEL_STRIPS = None                                             # or ((pin, count, order), ...) to split the PIXEL_COUNT
+                                                                # pixels over several data pins, the first on PIXEL_PIN
 HELIX_TURNS = 7.8
-HELIX_HEIGHT = PIXEL_COUNT
 SPARK_COUNT = 8
 SPIRAL_DRIFT = 0.196
 
@@ -55,41 +76,138 @@ SENSOR_MAX_VAL = 180
 SENSOR_MIN_VAL = 1
 SENSOR_EXPONENT = 2
 
+SENSOR_MEDIAN_SIZE = 3                                          # samples in the spike-rejecting median
+SENSOR_EMA_SHIFT = 1                                            # EMA alpha = 1 / 2**shift
+SENSOR_STILL_TOLERANCE = 3                                      # mm of jitter still counted as "no movement"
+PRESENCE_ENTER_MM = 150                                         # someone is present below this range...
+PRESENCE_EXIT_MM = 170                                          # ...until it rises above this one
+PRESENCE_ENTER_SAMPLES = 1                                      # readings in a row below PRESENCE_ENTER_MM to arrive
+PRESENCE_EXIT_SAMPLES = 3                                       # readings in a row above PRESENCE_EXIT_MM to leave
+
+# attract loop: (effect, seconds, weight); weights matter when shuffled
+ATTRACT_PLAYLIST = (
+    ("lightning", 5.0, 3),
+    ("fire", 12.0, 2),
+    ("stripes", 8.0, 1),
+    ("rainbow", 8.0, 1),
+    ("palettes", 16.0, 1),
+)
+ATTRACT_SHUFFLE = True
+ATTRACT_CROSSFADE = 1.0
+RAINBOW_FPS = 30                                                # michael.py rainbow_cycle() pace
+FRAME_CACHE_BUDGET = 16384                                      # bytes of prerendered animation kept in RAM
+ATTRACT_PALETTES = (FIRESIDE, HARBOR, BIRTHDAY, CRUISE, DAHLIA)  # colors.py palettes the "palettes" effect cycles
+PALETTE_HOLD = 6.0                                              # seconds on each palette...
+PALETTE_FADE = 2.0                                              # ...then a gradient crossfade to the next
+PALETTE_CACHE_SIZE = 4                                          # gradients resident at once, 768 bytes each
+
 INTERACTION_TIMEOUT = 15
 REQUIRED_STABLE_READINGS = 25
-SENSOR_POLL_INTERVAL = 0.1
+SENSOR_POLL_INTERVAL = 0.1                                      # continuous ranging period of each sensor
+SENSOR_CHECK_INTERVAL = 0.01                                    # how often to check for a finished reading
+SENSOR_ADDRESSES = (0x29, 0x69)                                 # every VL6180X on the bus; add more here
+SENSOR_X = 0                                                    # index in SENSOR_ADDRESSES of the distance sensor...
+SENSOR_Y = 1                                                    # ...and of the hue sensor
+SENSOR_I2C_BUDGET = 0.002                                       # I2C time one sensor_task pass may use, seconds
+SENSOR_HISTORY_SIZE = 4                                         # timestamped samples kept for resampling
+SENSOR_SMOOTH_DELAY = SENSOR_POLL_INTERVAL / 2                  # render this far behind the newest sample...
+SENSOR_EXTRAPOLATE = SENSOR_POLL_INTERVAL / 2                   # ...and follow its trend at most this far past it
+BUTTON_POLL_INTERVAL = 0.01
+RENDER_FPS = 50                                                 # fixed frame rate, scheduled against deadlines
+RENDER_QUALITY_LEVELS = 3                                       # effect detail steps shed when frames run late
+TELEMETRY_INTERVAL = 0.1                                        # one binary telemetry record per interval...
+TELEMETRY_FLUSH_INTERVAL = 1.0                                  # ...sent in batches no more often than this
+PROFILE_INTERVAL = 10.0                                         # per-stage timing summary period
+EVENT_LOG_PATH = "events.log"                                   # on CIRCUITPY; rotated to events.log.1, .2
+CRASH_LOG_PATH = "crash.txt"                                    # traceback of the last crash
+EVENT_LOG_MIN_INTERVAL = 60.0                                   # at most one batched flash write per minute
+LONG_FRAME = 0.05                                               # frames ending this far past deadline are logged
+PROFILE_ALLOCATIONS = False                                     # debug: flag stages that allocate in steady state
+FRAME_MIN_REFRESH = 1.0                                         # resend an unchanged frame at least this often
 
 # INSTANTIATION
 i2c = busio.I2C(board.SCL, board.SDA)
-sensorX = adafruit_vl6180x.VL6180X(i2c)
-sensorY = adafruit_vl6180x.VL6180X(i2c, 0x69)
+sensor_drivers = [adafruit_vl6180x.VL6180X(i2c, address)       # power-on tuning for each sensor
+                  for address in SENSOR_ADDRESSES]
+sensor_array = SensorArray([RangeSensor(i2c, address, SENSOR_POLL_INTERVAL)   # continuous-mode readers
+                            for address in SENSOR_ADDRESSES], SENSOR_I2C_BUDGET)
+rangerX = sensor_array.sensors[SENSOR_X]
+rangerY = sensor_array.sensors[SENSOR_Y]
+filterX = RangeFilter(SENSOR_MEDIAN_SIZE, SENSOR_EMA_SHIFT)
+filterY = RangeFilter(SENSOR_MEDIAN_SIZE, SENSOR_EMA_SHIFT)
+presence = PresenceDetector(PRESENCE_ENTER_MM, PRESENCE_EXIT_MM,
+                            PRESENCE_ENTER_SAMPLES, PRESENCE_EXIT_SAMPLES)
+historyX = SampleHistory(SENSOR_HISTORY_SIZE, SENSOR_SMOOTH_DELAY, SENSOR_EXTRAPOLATE)
+historyY = SampleHistory(SENSOR_HISTORY_SIZE, SENSOR_SMOOTH_DELAY, SENSOR_EXTRAPOLATE)
 pixels = neopixel.NeoPixel(PIXEL_PIN, PIXEL_COUNT, bpp=PIXEL_BYTES,
                            brightness=PIXEL_BRIGHTNESS, auto_write=PIXEL_AUTO_WRITE,
                            pixel_order=PIXEL_ORDER)
+output_stage = OutputStage(PIXEL_GAMMA, PIXEL_BRIGHTNESS)      # gamma + brightness for the whole frame in one pass
+power_limiter = PowerLimiter(POWER_BUDGET_MA, PIXEL_COUNT, PIXEL_ORDER,
+                             POWER_CHANNEL_MA, POWER_IDLE_MA)   # dims frames that would brown out the supply
+if PIXEL_STRIPS:                                                # only strips that changed are rewritten
+    frame = MultiFrameBuffer([(pixels.pin if pin is PIXEL_PIN else pin, count, order)
+                              for pin, count, order in PIXEL_STRIPS],
+                             FRAME_MIN_REFRESH, output_stage, power_limiter, PIXEL_DITHER)
+else:
+    frame = FrameBuffer(PIXEL_COUNT, PIXEL_ORDER, pixels.pin, FRAME_MIN_REFRESH, output_stage, power_limiter,
+                        PIXEL_DITHER)
 
 button1 = digitalio.DigitalInOut(board.D0)                      # define our pin
 button1.direction = digitalio.Direction.INPUT                   # define that we're using it as an INPUT, not an OUTPUT
 button1.pull = digitalio.Pull.DOWN                              # defalt the input to LOW (false)
 
-gamma_table = [int((i / 255) ** 2.2 * 255 + 0.5) for i in range(256)]
-pixels_np = np.array(pixels, dtype=np.int16)
-fire_fade_by = np.array((-3, -3, -3), dtype=np.int16)
+helix = Helix(PIXEL_COUNT, HELIX_TURNS)                        # per-LED angle and height tables
+register("lightning", Lightning)
+register("fire", lambda: Fire(PIXEL_COUNT, SPIRAL_DRIFT, SPARK_COUNT, helix=helix, deep=PIXEL_DITHER))
+register("stripes", lambda: Stripes(helix, MAX_BLUE))
+frame_cache = framecache.FrameCache(FRAME_CACHE_BUDGET)         # prerendered deterministic animations, LRU within budget
+register("rainbow", lambda: CachedAnimation(frame_cache, "rainbow", lambda: framecache.rotation(
+    rainbow_frame(PIXEL_COUNT, PIXEL_ORDER), len(PIXEL_ORDER)), RAINBOW_FPS))
+palette_cache = PaletteCache(PALETTE_CACHE_SIZE)
+register("palettes", lambda: PaletteWave(PIXEL_COUNT, ATTRACT_PALETTES, palette_cache, PALETTE_HOLD, PALETTE_FADE))
+governor = FrameGovernor(RENDER_FPS, RENDER_QUALITY_LEVELS - 1)
+attract = Sequencer(frame, Playlist(ATTRACT_PLAYLIST, ATTRACT_SHUFFLE),
+                    ATTRACT_CROSSFADE, governor.period)        # overruns are counted against one frame
+loop_profiler = profiler.StageProfiler(profiler.STAGE_NAMES, True, PROFILE_ALLOCATIONS)
+hue_table = build_hue_table()                                   # hue step -> full-value RGB
+hue_index_table = build_hue_index_table(SENSOR_MIN_VAL, SENSOR_MAX_VAL)   # raw y (mm) -> hue step
+if PIXEL_DITHER and PIXEL_DITHER_FILL:
+    value_table = build_value_table16(SENSOR_MIN_VAL, SENSOR_MAX_VAL)     # raw x (mm) -> inverted, squared 8.8 value
+    fill_color = hue_value_fill16
+else:
+    value_table = build_value_table(SENSOR_MIN_VAL, SENSOR_MAX_VAL)       # raw x (mm) -> inverted, squared value
+    fill_color = hue_value_fill
+event_log = eventlog.EventLog(EVENT_LOG_PATH, min_interval=EVENT_LOG_MIN_INTERVAL)
+telemetry = Telemetry(loop_profiler, int(TELEMETRY_FLUSH_INTERVAL / TELEMETRY_INTERVAL) + 4,
+                      TELEMETRY_FLUSH_INTERVAL)                # usb_cdc.data if boot.py enabled it, else the console
 
 # FUNCTIONS
 
-# TODO add SD card write to this routine
 def handle_crash(e):
     crash_time = time.monotonic()
     print(f"\n\n---- FATAL ERROR AT TIME {crash_time} ----------------")
     print("Exception occurred.")
+    try:
+        event_log.log(crash_time, eventlog.CRASH)
+        event_log.flush(crash_time, force=True)                 # everything still in RAM goes to flash now
+        with open(CRASH_LOG_PATH, "w") as log:
+            traceback.print_exception(e, file=log)
+    except Exception as le:
+        print("Crash log unavailable:", le)
     try:
         traceback.print_exception(e)
     except Exception as te:
         print("Traceback/logging unavailable:", te)
 
-    for i in range(PIXEL_COUNT):
-        pixels[i] = CRASH_RED if i % 2 == 0 else CRASH_YELLOW
-    pixels.show()
+    try:                                                        # through frame, to stay inside the power budget
+        for i in range(PIXEL_COUNT):
+            frame.set_pixel(i, CRASH_RED if i % 2 == 0 else CRASH_YELLOW)
+        frame.show()
+    except Exception:
+        for i in range(PIXEL_COUNT):
+            pixels[i] = CRASH_RED if i % 2 == 0 else CRASH_YELLOW
+        pixels.show()
     while True:
         pass # Halt program. Do nothing forever.
 
@@ -104,84 +222,203 @@ def print_boot_stats():
     print(f"     - Heap RAM Used:      {used} bytes")
     print(f"     - Heap RAM Remaining: {free} bytes\n")
 
-def get_raw_sensor_x():
-    return int(sensorX.range)
-
-def get_raw_sensor_y():
-    return int(sensorY.range)
-
-def scale_sensor_value(raw_value, input_min, input_max):
-    """(raw value, min input, max input) return int (0-255)"""
-    if input_max == input_min:
-        return 0
-    if raw_value < input_min:
-        return 0
-    if raw_value > input_max:
-        return 255
-    scaled = (raw_value - input_min) / (input_max - input_min)
-    return int(scaled * 255)
-
-def no_interaction(elapsed_seconds):
-    global last_x, last_y, stable_count
-    interaction_timeout_reached = (time.monotonic() - boot_time) > elapsed_seconds
-    if x == last_x and y == last_y:
-        stable_count += 1
+def no_interaction(elapsed_seconds, now):
+    """
+    Called once per filtered sensor sample pair. Readings within
+    SENSOR_STILL_TOLERANCE of the last movement count as stable, so sensor
+    jitter no longer resets stable_count. Slow drift still adds up to movement.
+    """
+    interaction_timeout_reached = (now - state.idle_since) > elapsed_seconds
+    if (abs(state.x - state.last_x) <= SENSOR_STILL_TOLERANCE
+            and abs(state.y - state.last_y) <= SENSOR_STILL_TOLERANCE):
+        state.stable_count += 1
     else:
-        stable_count = 0
-    last_x = x
-    last_y = y
-    inputs_stable = stable_count >= REQUIRED_STABLE_READINGS
-    return interaction_timeout_reached and inputs_stable
-
-def grab_attention():
-    lightning(pixels)
+        state.stable_count = 0
+        state.last_x = state.x                                  # movement sets a new reference point
+        state.last_y = state.y
+    inputs_stable = state.stable_count >= REQUIRED_STABLE_READINGS
+    return interaction_timeout_reached and inputs_stable and not state.present
+
+def grab_attention(now):
+    attract.start(now)
    
+# boot patterns go through frame too, so full white stays inside the power budget
 def test_leds():
     for color in [MAX_RED, MAX_GREEN, MAX_BLUE, MAX_WHITE]:
-        pixels.fill(color)
-        pixels.show()
+        frame.fill(color)
+        frame.show()
         time.sleep(0.75)
-    pixels.fill(BLACK)
-    pixels.show()
+    frame.fill(BLACK)
+    frame.show()
     time.sleep(0.25)
 
 def flash_ok():
     for _ in range(2):
-        pixels.fill(MAX_GREEN)
-        pixels.show()
+        frame.fill(MAX_GREEN)
+        frame.show()
         time.sleep(0.15)
-        pixels.fill(BLACK)
-        pixels.show()
+        frame.fill(BLACK)
+        frame.show()
         time.sleep(0.15)
     time.sleep(0.25)
 
 def flash_not_ok():
     for _ in range(3):
-        pixels.fill(MAX_RED)
-        pixels.show()
+        frame.fill(MAX_RED)
+        frame.show()
         time.sleep(0.33)
-        pixels.fill(BLACK)
-        pixels.show()
+        frame.fill(BLACK)
+        frame.show()
         time.sleep(0.33)
     time.sleep(0.67)
 
 def go_blue():
-    pixels.fill(MAX_BLUE)
+    frame.fill(MAX_BLUE)
+
+
+class KioskState:
+    """
+    Values shared between the kiosk tasks. Each field is written by one task
+    and only read by the others, except idle, which sensor_task raises and
+    render_task clears. Tasks only switch at await, so no locking is needed.
+    """
+
+    def __init__(self, now):
+        # sensor_task
+        self.x = 0
+        self.y = 0
+        self.x_time = 0.0                                       # when x and y were measured
+        self.y_time = 0.0
+        self.last_x = 0
+        self.last_y = 0
+        self.stable_count = 0
+        self.present = False
+        self.x_fault = False                                    # sensor reporting a fault, not just no target
+        self.y_fault = False
+        self.idle = False
+        # button_task
+        self.button = False
+        # render_task
+        self.idle_since = now
+
+def log_sensor_fault(ranger, was_faulty, now):
+    """Log a sensor entering or leaving a fault; returns whether it is in one now."""
+    if ranger.fault != was_faulty:
+        event_log.log(now, eventlog.SENSOR_FAULT, ranger.address, ranger.status if ranger.fault else 0)
+    return ranger.fault
+
+# TASKS
+async def sensor_task():
+    now = time.monotonic()
+    sensor_array.start(now)                                     # staggered so results land apart
+    while True:
+        loop_profiler.start(profiler.SENSOR)
+        now = time.monotonic()
+        sensor_array.poll(now)                                  # round robin, bounded by SENSOR_I2C_BUDGET
+        if sensor_array.updated[SENSOR_X]:
+            state.x = filterX.update(sensor_array.values[SENSOR_X])
+            state.x_time = rangerX.timestamp
+            historyX.add(rangerX.timestamp_ms, state.x)         # render_task resamples between readings
+            state.x_fault = log_sensor_fault(rangerX, state.x_fault, now)
+        if sensor_array.updated[SENSOR_Y]:                      # Y finishes each staggered pair of readings
+            state.y = filterY.update(sensor_array.values[SENSOR_Y])
+            state.y_time = rangerY.timestamp
+            historyY.add(rangerY.timestamp_ms, state.y)
+            state.y_fault = log_sensor_fault(rangerY, state.y_fault, now)
+            state.present = presence.update(min(state.x, state.y))
+            if no_interaction(INTERACTION_TIMEOUT, now):
+                state.idle = True
+        loop_profiler.stop(profiler.SENSOR)
+        await asyncio.sleep(SENSOR_CHECK_INTERVAL)
+
+async def button_task():
+    while True:
+        state.button = button1.value                            # get the current status of the button
+        await asyncio.sleep(BUTTON_POLL_INTERVAL)
+
+async def render_task():
+    while True:
+        loop_profiler.start(profiler.COMPUTE)
+        current_time = governor.begin(time.monotonic())         # scheduled frame time: steady dt for the effects
+
+        # do something to catch attention if there has been no interaction for a while,
+        # and drop it the moment a visitor moves or presses the button
+        if attract.running and (state.stable_count == 0 or state.present or state.button):
+            attract.stop()
+            event_log.log(current_time, eventlog.ATTRACT_STOP)
+        elif state.idle and not attract.running:
+            grab_attention(current_time)
+            event_log.log(current_time, eventlog.ATTRACT_START)
+            state.idle_since = current_time
+        state.idle = False
+
+        loop_profiler.stop(profiler.COMPUTE)
+
+        loop_profiler.start(profiler.RENDER)
+        if attract.running:                                     # attract playlist advances one frame per render
+            attract.step(current_time)
+        elif state.button:                                      # condition to follow if the button is pushed
+            frame.fill(MAX_BLUE)
+        else:                                                   # otherwise follow this
+            # map readings, resampled at this frame's time so the color glides
+            # between 10 Hz samples, to a color: scaling, clamping, inversion
+            # and the exponential curve are all baked into the tables built at boot
+            frame_ms = ticks_ms()                               # small-int ms: exact however long the uptime
+            fill_color(frame, hue_table, hue_index_table[historyY.at(frame_ms)],
+                       value_table[historyX.at(frame_ms)])
+            #frame.fill(rgb_fade(MAX_RED, x_final))             # fade based on proximity
+        loop_profiler.stop(profiler.RENDER)
+
+        loop_profiler.start(profiler.SHOW)
+        frame.show(current_time)                                # skipped when nothing changed
+        loop_profiler.stop(profiler.SHOW)
+
+        delay = governor.end(time.monotonic())                  # counts late/dropped frames, adjusts quality
+        if governor.lateness > LONG_FRAME:
+            event_log.log(current_time, eventlog.LONG_FRAME, 0, int(governor.lateness * 1000000))
+        attract.set_quality(governor.quality, governor.max_quality)
+        await asyncio.sleep(delay)
+
+async def telemetry_task():
+    next_profile = time.monotonic() + PROFILE_INTERVAL
+    while True:
+        await asyncio.sleep(TELEMETRY_INTERVAL)
+        loop_profiler.start(profiler.TELEMETRY)
+        now = time.monotonic()
+        flags = 0
+        if state.present:
+            flags |= FLAG_PRESENT
+        if attract.running:
+            flags |= FLAG_ATTRACT
+        if state.button:
+            flags |= FLAG_BUTTON
+        telemetry.record(now, state.x, state.y, flags, frame, governor)
+        telemetry.flush(now)                                    # capped rate; decode with sim/decode_telemetry.py
+        if not attract.running and not state.present and state.stable_count >= REQUIRED_STABLE_READINGS:
+            event_log.flush(now)                                # flash stalls only land on a still, unwatched frame
+        loop_profiler.stop(profiler.TELEMETRY)
+        if now >= next_profile:
+            loop_profiler.dump()                                # per-stage percentiles for the last window
+            attract.report()                                    # effect step times and budget overruns
+            governor.report()                                   # late/dropped frames and current quality
+            power_limiter.report()                              # how often and how far frames were dimmed
+            sensor_array.report()                               # per-sensor latency and I2C errors
+            next_profile += PROFILE_INTERVAL
+
+async def main():
+    loop_profiler.reset()                                       # first window starts after boot
+    await asyncio.gather(
+        asyncio.create_task(sensor_task()),
+        asyncio.create_task(button_task()),
+        asyncio.create_task(render_task()),
+        asyncio.create_task(telemetry_task()),
+    )
 
 
 # INITIALIZATION
 boot_time = time.monotonic()
-x = 0
-y = 0
-last_x = 0
-last_y = 0
-stable_count = 0
-last_sensor_poll_time = 0.0
-
-execution_min = float("inf")
-execution_max = 0.0
-execution_total = 0.0
-execution_count = 0
+state = KioskState(boot_time)
+event_log.log(boot_time, eventlog.BOOT, 0, gc.mem_free())
 
 gc.collect()
 print_boot_stats()
@@ -195,68 +432,6 @@ print("---- INITIALIZATION COMPLETE --------------------")
 # MAIN LOOP
 # =========================================================================================================
 try:                                                            # prepare to catch execution exception
-    while True:                                
-        read_button_1 = button1.value                           # get the current status of the button
-
-        # get current time
-        current_time = time.monotonic()
-
-        # get sensor data if enough time has passed
-        if current_time - last_sensor_poll_time >= SENSOR_POLL_INTERVAL:
-            x = get_raw_sensor_x()
-            y = get_raw_sensor_y()
-            last_sensor_poll_time = current_time
-
-        # print sensor data to console. 
-        # TODO remove this
-        print(f"\rX:{x:3}mm | Y:{y:3}mm", end="")
-
-        # do something to catch attention if there has been no interaction for a while
-        if no_interaction(INTERACTION_TIMEOUT):
-            grab_attention()
-            boot_time = current_time
-
-        #scale and clamp sensor readings
-        x_scaled = scale_sensor_value(x, SENSOR_MIN_VAL, SENSOR_MAX_VAL)
-        y_scaled = scale_sensor_value(y, SENSOR_MIN_VAL, SENSOR_MAX_VAL)
-
-      
-        x_final = int(((255 - x_scaled) ** 2 / (255 ** 2)) * 255) # invert and exponentially scale. Rework to reduce run-time floating-point math.
-        y_final = y_scaled / 255 * 360
-
-        color = hue_value_to_rgb(y_final, x_final)
-   
-        #color = rgb_fade(MAX_RED, x_final)                     # fade based on proximity
-       
-       
-        if read_button_1:                                       # condition to follow if the button is pushed (e.g. read_button = True)
-            pixels.fill(MAX_BLUE)
-        else:                                                   # otherwise follow this   
-            pixels.fill(color)  
-
-        pixels.show()
-
-        #pixels_np = fire(pixels_np, fire_fade_by, PIXEL_COUNT, SPIRAL_DRIFT, SPARK_COUNT)
-        #pixels[:] = pixels_np.tolist()
-        #pixels.show()
-
-        execution_time = time.monotonic() - current_time
-
-        
-
-        # Track stats
-        execution_total += execution_time
-        execution_count += 1
-        if execution_time < execution_min:
-            execution_min = execution_time
-        if execution_time > execution_max:
-            execution_max = execution_time
-
-        # Every 100 iterations, print stats
-        if execution_count % 100 == 0:
-            avg = execution_total / execution_count
-            print(f" | ExecTime: min={execution_min:.4f}s | max={execution_max:.4f}s | avg={avg:.4f}s", end="")
-       
-   
+    asyncio.run(main())                                         # sensor, button, render and telemetry tasks run cooperatively
 except Exception as e:                                          # catch thrown exception
     handle_crash(e)                                             # handle and halt program
@@ -4,7 +4,9 @@ import time
 import math
 import random
 from ulab import numpy as np
+from rainbowio import colorwheel
 from colors import FIRE
+from palettes import GRADIENT_STEPS, sample, crossfade
 from utils import hex_to_rgb, rgb_fade
 
 def fire(pixels_np, fade_by, pixel_count, spiral_drift, spark_count):
@@ -31,6 +33,79 @@ def fire(pixels_np, fade_by, pixel_count, spiral_drift, spark_count):
 
     return np.clip(pixels_np, 0, 255)
 
+class Fire:
+    """
+    Whole-array version of fire(). The cooling gradient and spiral angle
+    for every pixel are computed once here, so each frame is a handful of
+    ulab operations instead of a Python loop over the strip.
+
+    With deep=True the heat stays in floats between frames rather than being
+    truncated to integers each frame, and step() hands frames with a deep
+    layer 8.8 values, so slow fades near black are dithered instead of stepping.
+    """
+
+    def __init__(self, pixel_count, spiral_drift, spark_count, fade_by=3, helix=None, deep=False):
+        self.pixel_count = pixel_count
+        self.spark_count = spark_count
+        self.full_spark_count = spark_count
+        self.twinkle_every = 1                                  # frames between twinkle updates
+        self.frame = 0
+        self.cooling = None
+        self.base_color = hex_to_rgb(FIRE)
+        self.deep = deep
+        heat_type = np.float if deep else np.int16
+        self.heat = np.zeros((pixel_count, 3), dtype=heat_type)
+        self.fade_by = np.array((-fade_by, -fade_by, -fade_by), dtype=heat_type)
+
+        # Index 0 is the top of the strip; inv_i counts pixels up from the bottom.
+        # Both tables are column vectors so they broadcast across R, G and B.
+        # Given a helix.Helix, the twist follows the real LED angles instead of spiral_drift.
+        inv_i = (pixel_count - 1) - np.arange(pixel_count, dtype=np.float)
+        self.vertical_cool = (1.0 - (inv_i / pixel_count) * 0.5).reshape((pixel_count, 1))
+        if helix is None:
+            self.angle = (inv_i * spiral_drift).reshape((pixel_count, 1))
+        else:
+            self.angle = helix.column(helix.angle)
+
+    def update(self, now):
+        """Advance the fire one frame and return the RGB working array (int16, float if deep)."""
+        heat = self.heat
+
+        # Create new sparks at the bottom (highest index)
+        for _ in range(self.spark_count):
+            r = random.random()
+            index = self.pixel_count - 1 - int((1.0 - r**2) * (self.pixel_count // 8))
+            heat[index] = tuple(max(0, min(255, val + random.randint(-40, 40))) for val in self.base_color)
+
+        # Fade and clamp first, so the cooling multiply can never leave 0-255
+        heat += self.fade_by
+        heat = np.clip(heat, 0, 255)
+
+        # Cooling gradient + spiral twist, one twinkle phase for the whole frame
+        if self.cooling is None or self.frame % self.twinkle_every == 0:
+            twinkle = 0.9 + 0.1 * np.sin(self.angle + now * 2)
+            self.cooling = np.clip(self.vertical_cool * twinkle, 0.0, 1.0)
+        self.frame += 1
+        if self.deep:
+            self.heat = heat * self.cooling
+        else:
+            self.heat = np.array(heat * self.cooling, dtype=np.int16)
+        return self.heat
+
+    def set_quality(self, level, max_level):
+        """Fewer sparks and less frequent twinkle updates as level drops toward 0."""
+        self.spark_count = max(1, self.full_spark_count * (level + 1) // (max_level + 1))
+        self.twinkle_every = 1 + max_level - level
+
+    def step(self, frame, now):
+        """Render one frame of fire into frame (a FrameBuffer)."""
+        heat = self.update(now)
+        if self.deep and frame.deep is not None:
+            frame.load_deep(np.array(heat * 256, dtype=np.uint16))
+        else:
+            frame.load(heat)
+        return True
+
 def random_stroke_count():
     """
     Return a stroke count (3–12), biased toward lower numbers.
@@ -56,13 +131,6 @@ def random_lightning_color(brightness=255):
     b = random.randint(int(0.9 * brightness), brightness)
     return (r, g, b)
 
-def random_delay_leader():
-    """
-    Return a short delay (in seconds) for leader steps,
-    simulating a fast stepped leader descent.
-    """
-    return random.uniform(0.001, 0.004)  # 1 to 4 milliseconds
-
 def random_delay_flash():
     """
     Return a pseudo-Gaussian flash duration (seconds),
@@ -73,41 +141,166 @@ def random_delay_flash():
     delay = sum(random.uniform(0.02, 0.08) for _ in range(3)) / 3
     return delay
 
-def lightning(pixels):
-    """
-    Simulate a lightning flash sequence.
-    
-    Parameters:
-    - pixels: NeoPixel object (1-based index, top to bottom)
-    - stroke_count: number of main flashes
-    - delay_leader: delay between pixels during leader sweep
-    - delay_flash: duration of main flashes
-    """
-    num_pixels = len(pixels)
-    stroke_count = random_stroke_count()
-    delay_leader = random_delay_leader()
-    delay_flash = random_delay_flash()
-
-    # 1. Leader phase: sweep top to bottom
-    for i in range(num_pixels):
-        pixels[i] = random_lightning_color(brightness=80)  # Dim leader
-        pixels.show()
-        #time.sleep(delay_leader)
-        # TODO make stroke go faster; use 5 pixels at once
-
-    time.sleep(0.02)
-
-    # 2. Main stroke flashes
-    for _ in range(stroke_count):
-        # Flash all pixels with full-bright bluish-white
-        color = random_lightning_color(brightness=255)
-        for i in range(num_pixels):
-            pixels[i] = color
-        pixels.show()
-        time.sleep(delay_flash)
-
-        # Go dark briefly
-        for i in range(num_pixels):
-            pixels[i] = (0, 0, 0)
-        pixels.show()
-        time.sleep(random.uniform(0.02, 0.07))  # Random flicker delay
+# Lightning phases
+_LEADER = 0
+_PAUSE = 1
+_FLASH = 2
+_DARK = 3
+
+class Lightning:
+    """
+    Frame-stepped lightning flash sequence.
+
+    start() picks a new strike; each step(frame, now) advances it by one
+    frame and returns False once the strike has finished. The leader sweeps
+    leader_step pixels per frame and the stroke and dark phases end on
+    deadlines instead of time.sleep(), so the caller keeps polling sensors
+    and can stop() the strike at any frame.
+    """
+
+    def __init__(self, leader_step=5):
+        self.leader_step = leader_step
+        self.running = False
+        self.phase = _LEADER
+        self.position = 0
+        self.deadline = 0.0
+        self.stroke_count = 0
+        self.delay_flash = 0.0
+
+    def start(self, now):
+        self.stroke_count = random_stroke_count()
+        self.delay_flash = random_delay_flash()
+        self.phase = _LEADER
+        self.position = 0
+        self.deadline = now
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def step(self, frame, now):
+        if not self.running:
+            return False
+
+        if self.phase == _LEADER:
+            # 1. Leader phase: sweep top to bottom, several dim pixels per frame
+            stop = min(self.position + self.leader_step, len(frame))
+            for i in range(self.position, stop):
+                frame.set_pixel(i, random_lightning_color(brightness=80))
+            self.position = stop
+            if stop >= len(frame):
+                self.phase = _PAUSE
+                self.deadline = now + 0.02
+        elif now < self.deadline:
+            pass                                                # hold the current flash or dark frame
+        elif self.phase == _FLASH:
+            # Go dark briefly
+            frame.fill((0, 0, 0))
+            self.phase = _DARK
+            self.deadline = now + random.uniform(0.02, 0.07)    # Random flicker delay
+        elif self.stroke_count > 0:
+            # 2. Main stroke flashes with full-bright bluish-white
+            frame.fill(random_lightning_color(brightness=255))
+            self.stroke_count -= 1
+            self.phase = _FLASH
+            self.deadline = now + self.delay_flash
+        else:
+            self.running = False
+
+        return self.running
+
+class Stripes:
+    """
+    Colored stripes rotating around a helix.Helix. Each frame is one cosine
+    over the precomputed LED angles and a broadcast multiply by the color.
+    """
+
+    def __init__(self, helix, color, count=3, speed=1.0):
+        self.helix = helix
+        self.color = np.array(color, dtype=np.float)
+        self.count = count
+        self.speed = speed                                      # radians per second
+
+    def step(self, frame, now):
+        intensity = self.helix.column(self.helix.stripes(self.count, now * self.speed))
+        frame.load(np.array(intensity * self.color, dtype=np.uint8))
+        return True
+
+class PaletteWave:
+    """
+    A colors.py palette's gradient laid once along the strip and scrolled
+    speed gradient steps a second. Every hold seconds it moves on to the
+    next palette in palette_list over a fade-second crossfade of the two
+    gradients. Gradients come from a palettes.PaletteCache. Each frame is
+    one palettes.sample() lookup; scrolling is an in-place add to the uint8
+    index array, which wraps around the gradient by itself. The crossfade
+    and the sampled colors go into arrays made once, so no frame allocates.
+    """
+
+    def __init__(self, pixel_count, palette_list, cache, hold=6.0, fade=2.0, speed=40.0):
+        self.palettes = palette_list
+        self.cache = cache
+        self.hold = hold
+        self.fade = fade
+        self.speed = speed
+        self.indices = np.array([i * GRADIENT_STEPS // pixel_count for i in range(pixel_count)],
+                                dtype=np.uint8)
+        self.offset = 0                                         # scroll already added to indices
+        self.blend = np.zeros((GRADIENT_STEPS, 3), dtype=np.uint8)   # gradient while two are crossfading
+        self.colors = np.zeros((pixel_count, 3), dtype=np.uint8)
+        self.started = 0.0
+
+    def start(self, now):
+        self.started = now
+
+    def step(self, frame, now):
+        elapsed = now - self.started
+        offset = int(elapsed * self.speed) & 0xFF
+        if offset != self.offset:
+            self.indices += (offset - self.offset) & 0xFF
+            self.offset = offset
+        cycle = self.hold + self.fade
+        k = int(elapsed / cycle)
+        gradient = self.cache.get(self.palettes[k % len(self.palettes)])
+        fading = elapsed - k * cycle - self.hold
+        if fading > 0:
+            following = self.cache.get(self.palettes[(k + 1) % len(self.palettes)])
+            gradient = crossfade(gradient, following, fading / self.fade, self.blend)
+        frame.load(sample(gradient, self.indices, self.colors))
+        return True
+
+def rainbow_frame(pixel_count, pixel_order):
+    """One frame of michael.py rainbow_cycle() (j = 0) as wire-order bytes."""
+    bpp = len(pixel_order)
+    red = pixel_order.index("R")
+    green = pixel_order.index("G")
+    blue = pixel_order.index("B")
+    frame = bytearray(pixel_count * bpp)
+    for i in range(pixel_count):
+        color = colorwheel((i * 256 // pixel_count) & 255)
+        frame[i * bpp + red] = color >> 16 & 0xFF
+        frame[i * bpp + green] = color >> 8 & 0xFF
+        frame[i * bpp + blue] = color & 0xFF
+    return frame
+
+class CachedAnimation:
+    """
+    Plays a deterministic animation from a framecache.FrameCache at a fixed
+    frame rate. build() makes the FrameSequence the first time it is needed,
+    or again after the cache evicted it.
+    """
+
+    def __init__(self, cache, name, build, fps=50):
+        self.cache = cache
+        self.name = name
+        self.build = build
+        self.fps = fps
+        self.started = 0.0
+
+    def start(self, now):
+        self.started = now
+
+    def step(self, frame, now):
+        sequence = self.cache.get(self.name, self.build)
+        sequence.play(frame, int((now - self.started) * self.fps))
+        return True
@@ -0,0 +1,130 @@
+# eventlog.py
+
+import os
+import struct
+
+# One record, little-endian, RECORD_SIZE bytes:
+#   magic "EV", sequence, time (ms), event code, a, b, checksum (low byte of
+#   the sum of every byte before it). sim/read_events.py unpacks the same layout.
+MAGIC = b"EV"
+RECORD_FORMAT = "<2sHIBhiB"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+# Event codes, and what a and b carry for each
+BOOT = 1                                                        # b = free heap
+CRASH = 2
+SENSOR_FAULT = 3                                                # a = I2C address, b = range status (0 when it clears)
+ATTRACT_START = 4
+ATTRACT_STOP = 5
+LONG_FRAME = 6                                                  # b = microseconds past the frame deadline
+EVENT_NAMES = {
+    BOOT: "boot",
+    CRASH: "crash",
+    SENSOR_FAULT: "sensor_fault",
+    ATTRACT_START: "attract_start",
+    ATTRACT_STOP: "attract_stop",
+    LONG_FRAME: "long_frame",
+}
+
+_EROFS = 30                                                     # filesystem mounted read-only for code
+
+class EventLog:
+    """
+    Fixed-size event records kept in a RAM ring and written to flash in batches.
+
+    log() only packs a record into the ring, so it is safe anywhere in the
+    loop. flush() appends every pending record with one write, and only once
+    batch records are waiting and min_interval has passed since the last
+    write; call it from idle points, or with force=True on a crash. When the
+    file would grow past max_bytes it is rotated to path.1, path.2 ... with
+    keep files in total. If the ring wraps before a flush, the oldest pending
+    records are overwritten and counted in lost. If the filesystem is not
+    writable (boot.py left it to USB), flushing stops and records stay in RAM.
+    """
+
+    def __init__(self, path="events.log", capacity=64, batch=16, min_interval=60.0,
+                 max_bytes=16384, keep=3):
+        self.path = path
+        self.capacity = capacity
+        self.batch = batch
+        self.min_interval = min_interval
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.ring = bytearray(capacity * RECORD_SIZE)
+        self.view = memoryview(self.ring)
+        self.head = 0                                           # slot for the next record
+        self.pending = 0                                        # records not yet on flash
+        self.seq = 0
+        self.lost = 0
+        self.written = 0
+        self.write_errors = 0
+        self.writable = True
+        self.next_flush = 0.0
+
+    def log(self, now, event, a=0, b=0):
+        offset = self.head * RECORD_SIZE
+        struct.pack_into(RECORD_FORMAT, self.ring, offset, MAGIC, self.seq & 0xFFFF,
+                         int(now * 1000) & 0xFFFFFFFF, event, a, b, 0)
+        checksum = 0
+        ring = self.ring
+        for i in range(offset, offset + RECORD_SIZE - 1):
+            checksum += ring[i]
+        ring[offset + RECORD_SIZE - 1] = checksum & 0xFF
+        self.seq += 1
+        self.head += 1
+        if self.head == self.capacity:
+            self.head = 0
+        if self.pending == self.capacity:
+            self.lost += 1
+        else:
+            self.pending += 1
+
+    def flush(self, now, force=False):
+        """Write pending records if a batch is due (or force). Returns True if written."""
+        if not self.pending or not self.writable:
+            return False
+        if not force and (self.pending < self.batch or now < self.next_flush):
+            return False
+        count = self.pending
+        first = self.head - count
+        if first < 0:
+            first += self.capacity
+        try:
+            self._rotate(count * RECORD_SIZE)
+            with open(self.path, "ab") as f:
+                end = first + count
+                if end <= self.capacity:
+                    f.write(self.view[first * RECORD_SIZE:end * RECORD_SIZE])
+                else:                                           # pending records wrap around the ring
+                    f.write(self.view[first * RECORD_SIZE:])
+                    f.write(self.view[:(end - self.capacity) * RECORD_SIZE])
+        except OSError as e:
+            self.write_errors += 1
+            if e.args and e.args[0] == _EROFS:
+                self.writable = False
+            return False
+        self.pending = 0
+        self.written += count
+        self.next_flush = now + self.min_interval
+        return True
+
+    def _rotate(self, incoming):
+        try:
+            size = os.stat(self.path)[6]
+        except OSError:
+            return                                              # no log yet
+        if size + incoming <= self.max_bytes:
+            return
+        for generation in range(self.keep - 1, 0, -1):
+            older = "%s.%d" % (self.path, generation)
+            newer = self.path if generation == 1 else "%s.%d" % (self.path, generation - 1)
+            try:
+                os.remove(older)
+            except OSError:
+                pass
+            try:
+                os.rename(newer, older)
+            except OSError:
+                pass
+        if self.keep <= 1:
+            os.remove(self.path)
@@ -0,0 +1,172 @@
+# filters.py
+
+from array import array
+from supervisor import ticks_ms                                 # noqa: F401  (re-exported with ticks_diff)
+
+# supervisor.ticks_ms() counts milliseconds as a small int, wrapping at 2**29,
+# so reading it every frame allocates nothing and never loses resolution.
+TICKS_PERIOD = 1 << 29
+_TICKS_MASK = TICKS_PERIOD - 1
+
+def ticks_diff(later, earlier):
+    """later - earlier in ms, for ticks_ms() values less than half a wrap apart."""
+    diff = (later - earlier) & _TICKS_MASK
+    if diff >= TICKS_PERIOD >> 1:
+        diff -= TICKS_PERIOD
+    return diff
+
+class MedianFilter:
+    """
+    Median of the last size samples, held in a fixed array ring buffer.
+    The sort is an insertion sort over a preallocated scratch array, so each
+    sample costs the same small, bounded amount of work and no allocation.
+    """
+
+    def __init__(self, size=3, initial=0):
+        self.size = size
+        self.ring = array("H", [initial] * size)
+        self.scratch = array("H", [initial] * size)
+        self.index = 0
+
+    def update(self, sample):
+        self.ring[self.index] = sample
+        self.index = (self.index + 1) % self.size
+
+        scratch = self.scratch
+        for i in range(self.size):
+            value = self.ring[i]
+            j = i
+            while j > 0 and scratch[j - 1] > value:
+                scratch[j] = scratch[j - 1]
+                j -= 1
+            scratch[j] = value
+        return scratch[self.size // 2]
+
+class EmaFilter:
+    """Integer exponential moving average with alpha = 1 / 2**shift, kept in 8.8 fixed point."""
+
+    def __init__(self, shift=1, initial=0):
+        self.shift = shift
+        self.acc = initial << 8
+
+    def update(self, sample):
+        self.acc += ((sample << 8) - self.acc) >> self.shift
+        return (self.acc + 128) >> 8
+
+class RangeFilter:
+    """Median to drop single-sample spikes, then EMA to smooth millimetre jitter."""
+
+    def __init__(self, median_size=3, ema_shift=1, initial=255):
+        self.median = MedianFilter(median_size, initial)
+        self.ema = EmaFilter(ema_shift, initial)
+        self.value = initial
+
+    def update(self, sample):
+        self.value = self.ema.update(self.median.update(sample))
+        return self.value
+
+class PresenceDetector:
+    """
+    Someone is present once a range stays below enter_mm for enter_samples
+    samples in a row, and stays present until it has been above exit_mm for
+    exit_samples in a row. The gap keeps a hand hovering near one threshold
+    from toggling presence on every sample; the hold counts keep a single
+    stray reading from doing it.
+    """
+
+    def __init__(self, enter_mm, exit_mm, enter_samples=1, exit_samples=1):
+        self.enter_mm = enter_mm
+        self.exit_mm = exit_mm
+        self.enter_samples = enter_samples
+        self.exit_samples = exit_samples
+        self.present = False
+        self.held = 0                                           # samples in a row past the threshold to cross
+
+    def update(self, mm):
+        if self.present:
+            crossing = mm > self.exit_mm
+            needed = self.exit_samples
+        else:
+            crossing = mm < self.enter_mm
+            needed = self.enter_samples
+        if not crossing:
+            self.held = 0
+            return self.present
+        self.held += 1
+        if self.held >= needed:
+            self.present = not self.present
+            self.held = 0
+        return self.present
+
+class SampleHistory:
+    """
+    The last size timestamped samples of one input, resampled at any time.
+
+    at(ms) returns the value at ms - delay: interpolated between the two
+    samples around that moment, or, once it is past the newest sample,
+    extrapolated along the last two samples for at most horizon seconds and
+    then held. With delay and horizon at half the sample period, a render
+    loop faster than the sensor sees a value that moves every frame instead
+    of stepping once per sample, half a period late at most. Times are
+    ticks_ms() values, so they keep millisecond resolution however long the
+    kiosk runs, and the arithmetic is integer, so neither add() nor at()
+    allocates.
+    """
+
+    def __init__(self, size=4, delay=0.05, horizon=0.05, low=0, high=255):
+        self.size = size
+        self.times = array("l", [0] * size)                     # ticks_ms() of each sample
+        self.values = array("H", [0] * size)
+        self.head = 0                                           # slot of the newest sample
+        self.count = 0
+        self.delay_ms = int(delay * 1000)
+        self.horizon_ms = int(horizon * 1000)
+        self.low = low
+        self.high = high
+
+    def add(self, ms, value):
+        if self.count and ticks_diff(ms, self.times[self.head]) <= 0:   # same moment again: the newer reading wins
+            self.values[self.head] = value
+            return
+        if self.count:
+            self.head += 1
+            if self.head == self.size:
+                self.head = 0
+        if self.count < self.size:
+            self.count += 1
+        self.times[self.head] = ms
+        self.values[self.head] = value
+
+    def _clamp(self, value):
+        if value < self.low:
+            return self.low
+        if value > self.high:
+            return self.high
+        return value
+
+    def at(self, ms):
+        """The input's value at ms - delay (0 before the first sample)."""
+        if not self.count:
+            return self._clamp(0)
+        times = self.times
+        values = self.values
+        newest = self.head
+        if self.count == 1:
+            return values[newest]
+        older = newest - 1 if newest else self.size - 1
+        ahead = ticks_diff(ms, times[newest]) - self.delay_ms
+        if ahead >= 0:                                          # past the newest sample: extrapolate, then hold
+            if ahead > self.horizon_ms:
+                ahead = self.horizon_ms
+            span = ticks_diff(times[newest], times[older])
+            change = (values[newest] - values[older]) * ahead
+            return self._clamp(values[newest] + (change + (span >> 1)) // span)
+        for _ in range(self.count - 1):                         # newest first, back to the pair around the target
+            into = ticks_diff(ms, times[older]) - self.delay_ms
+            if into >= 0:
+                span = ticks_diff(times[newest], times[older])
+                change = (values[newest] - values[older]) * into
+                return values[older] + (change + (span >> 1)) // span
+            newest = older
+            older = newest - 1 if newest else self.size - 1
+        return values[newest]                                   # older than the whole history
@@ -0,0 +1,44 @@
+# fire_bench.py
+#
+# Frame-time comparison between the per-pixel effects.fire() and the
+# vectorized effects.Fire. Copy to the board as code.py and read the
+# results on the serial console. Only the effect math is timed; the
+# strip is never written, so the numbers exclude show() wire time.
+
+import gc
+import time
+from ulab import numpy as np
+from effects import fire, Fire
+
+PIXEL_COUNT = 250
+SPIRAL_DRIFT = 0.196
+SPARK_COUNT = 8
+FRAMES = 20
+
+def time_frames(render, frames):
+    """Run render() frames times and return the average frame time in ms."""
+    gc.collect()
+    start = time.monotonic_ns()
+    for _ in range(frames):
+        render()
+    return (time.monotonic_ns() - start) / frames / 1000000
+
+pixels_np = np.zeros((PIXEL_COUNT, 3), dtype=np.int16)
+fade_by = np.array((-3, -3, -3), dtype=np.int16)
+
+def render_loop():
+    global pixels_np
+    pixels_np = fire(pixels_np, fade_by, PIXEL_COUNT, SPIRAL_DRIFT, SPARK_COUNT)
+
+fire_effect = Fire(PIXEL_COUNT, SPIRAL_DRIFT, SPARK_COUNT)
+
+def render_vectorized():
+    fire_effect.update(time.monotonic())
+
+loop_ms = time_frames(render_loop, FRAMES)
+vector_ms = time_frames(render_vectorized, FRAMES)
+
+print(f"---- FIRE FRAME TIME ({PIXEL_COUNT} pixels, {FRAMES} frames) ----")
+print(f"     - effects.fire():  {loop_ms:.2f} ms/frame")
+print(f"     - effects.Fire:    {vector_ms:.2f} ms/frame")
+print(f"     - speedup:         {loop_ms / vector_ms:.1f}x")
@@ -13,10 +13,13 @@ BRIGHTNESS = 0.05
 import time, random
 import board, neopixel
 from ulab import numpy as np
+from framebuffer import FrameBuffer, OutputStage
 
 num_leds = 256  # 256 even though we're only showing 64
 
 leds = neopixel.NeoPixel(PIXEL_PIN, NUM_PIXELS, brightness=0.4, auto_write=False)
+frame = FrameBuffer(NUM_PIXELS, neopixel.GRB, leds.pin,  # wire-order buffer sharing the strip's pin
+                    output=OutputStage(gamma=1.0, brightness=0.4))  # 0.4 brightness as one table lookup at show()
 
 leds_np = np.array(leds, dtype=np.int16)  # numpy working copy of LED data
 
@@ -36,10 +39,10 @@ while True:
     # fade down all LEDs, using numpy,  takes 4 msec for 256 LEDs on RP2040
     leds_np += fade_by         # fade down the working numpy array
     leds_np = np.clip(leds_np, 0,255)  # constrain everyting to 0-255
-    leds[:] = leds_np.tolist()  # copy working array to leds
+    frame.load(leds_np)  # copy working array to the wire buffer; brightness is applied on output
 
     elapsed_time = time.monotonic() - start_time
     print(int(elapsed_time*1000))  # print out how long calculation took
 
     # update the strip
-    leds.show()
\ No newline at end of file
+    frame.show()
\ No newline at end of file
@@ -0,0 +1,495 @@
+# framebuffer.py
+
+import time
+from array import array
+import digitalio
+from ulab import numpy as np
+from neopixel_write import neopixel_write
+
+DITHER_FRAMES = 16                                              # temporal dither cycle, frames
+DEEP_STEPS = 16                                                 # table16 entries per 8-bit input step
+
+def build_output_curve(gamma, brightness, curve):
+    """
+    Fill a float array with the gamma corrected, brightness scaled output
+    (0-255.0) for len(curve) // 256 inputs per 8-bit step: entry i is input
+    i / (len(curve) // 256). The last step's fractions stay at full.
+    """
+    top = len(curve) - len(curve) // 256                        # entry for input 255.0
+    curve[:] = np.arange(len(curve), dtype=np.float)
+    curve /= top
+    curve[top:] = 1.0
+    curve **= gamma
+    curve *= brightness * 255
+    return curve
+
+class OutputStage:
+    """
+    Final per-frame output stage: gamma correction and global brightness
+    fused into one 256-entry table, applied to every byte of the frame with a
+    single np.take. limit is a further brightness factor owned by a
+    power.PowerLimiter. The gamma x brightness curve is only recomputed when
+    gamma or brightness change; a new limit rescales it into the table with
+    a few whole-array operations on preallocated arrays, so the limiter can
+    step every frame without a per-entry loop. version counts table changes
+    so a FrameBuffer knows to resend. table16 holds the same curve in 8.8
+    fixed point for dithered frames, DEEP_STEPS entries per input step so
+    inputs keep 4 fractional bits. It takes 8 KB plus its float curves, so
+    it stays None until a deep FrameBuffer calls enable_deep().
+    """
+
+    def __init__(self, gamma=2.2, brightness=1.0):
+        self.table_bytes = bytearray(256)
+        self.table = np.frombuffer(self.table_bytes, dtype=np.uint8)
+        self.table16 = None                                     # see enable_deep()
+        self._curve = np.zeros(256, dtype=np.float)             # gamma x brightness, before limit
+        self._curve16 = None
+        self._scaled = np.zeros(256, dtype=np.float)            # scratch for the limited curves
+        self._scaled16 = None
+        self.gamma = gamma
+        self.brightness = None
+        self.limit = 1.0
+        self.version = 0
+        self.set_brightness(brightness)
+
+    def _rebuild(self):
+        build_output_curve(self.gamma, self.brightness, self._curve)
+        if self._curve16 is not None:
+            build_output_curve(self.gamma, self.brightness, self._curve16)
+        self._rescale()
+
+    def _rescale(self):
+        scaled = self._scaled
+        scaled[:] = self._curve
+        scaled *= self.limit
+        scaled += 0.5                                           # round on the truncating store below
+        self.table[:] = scaled
+        if self.table16 is not None:
+            self._rescale16()
+        self.version += 1
+
+    def _rescale16(self):
+        scaled = self._scaled16
+        scaled[:] = self._curve16
+        scaled *= self.limit * 256
+        scaled += 0.5
+        self.table16[:] = scaled
+
+    def enable_deep(self):
+        """Allocate and fill table16, for a FrameBuffer with a deep layer. The 8-bit table is unchanged."""
+        if self.table16 is not None:
+            return
+        self.table16 = np.zeros(256 * DEEP_STEPS, dtype=np.uint16)
+        self._curve16 = build_output_curve(self.gamma, self.brightness,
+                                           np.zeros(256 * DEEP_STEPS, dtype=np.float))
+        self._scaled16 = np.zeros(256 * DEEP_STEPS, dtype=np.float)
+        self._rescale16()
+
+    def set_brightness(self, brightness):
+        if brightness == self.brightness:
+            return
+        self.brightness = brightness
+        self._rebuild()
+
+    def set_gamma(self, gamma):
+        if gamma != self.gamma:
+            self.gamma = gamma
+            self._rebuild()
+
+    def set_limit(self, limit):
+        if limit != self.limit:
+            self.limit = limit
+            self._rescale()
+
+    def apply(self, src, dst):
+        """src and dst are flat uint8 arrays of the same length."""
+        np.take(self.table, src, out=dst)
+
+class FrameBuffer:
+    """
+    Working frame kept in the strip's wire byte order (GRB for our strip).
+
+    The pixel data lives in one bytearray that ulab sees as an (n, bpp)
+    uint8 array through np.frombuffer, so effects write into the same memory
+    that show() hands to neopixel_write (directly, or through an OutputStage
+    into a second buffer of the same size). No per-frame lists or tuples are
+    built and adafruit_pixelbuf is bypassed entirely, which also means its
+    brightness scaling is not applied here; pass an OutputStage to apply
+    gamma and brightness to the whole frame on its way to the strip.
+
+    fill(), fill_rgb() and show() do not allocate: fills are one np.take of
+    a preallocated one-pixel pattern through a preallocated index, and the
+    copy of the sent frame goes through a slice object made once at startup.
+
+    show() skips the strip write when the frame matches the last one sent.
+    Solid frames from fill() are compared by color alone. Anything else is
+    compared byte for byte against a copy of the last transmitted buffer.
+    Code that writes to wire directly, instead of through these methods,
+    must call mark_dirty() so a stale fill color is not trusted. With
+    min_refresh set, an unchanged frame is still resent after that many
+    seconds. A power.PowerLimiter (which needs an output stage) checks every
+    frame on its way out and may dim it to fit the current budget.
+
+    With deep=True the frame also has a 16-bit layer, deep, in 8.8 fixed
+    point (wire order, like wire), written by load_deep() and fill_rgb16().
+    A frame written that way is gamma corrected at 16 bits through the output
+    stage's table16, which keeps the top 4 bits of each value's fraction, and
+    reduced to 8 bits with temporal dithering: each pixel adds a threshold
+    that steps through DITHER_FRAMES evenly spaced levels, so over the cycle
+    it averages the fractional level. Values below one 8-bit step near black
+    come out as the right share of lit frames instead of all collapsing to 0.
+    The dither pipeline is four np.take calls and two in-place adds into
+    preallocated arrays. Dithered frames are sent every frame, since they
+    change from frame to frame, except a fill_rgb16() solid whose channels
+    land on whole output levels: with no fraction left to dither it is held
+    like an 8-bit solid until it or the table changes. The 8-bit methods
+    keep working; the most recent write decides which layer is shown.
+    """
+
+    def __init__(self, count, pixel_order="GRB", pin=None, min_refresh=None, output=None, limiter=None,
+                 deep=False):
+        self.count = count
+        self.pixel_order = pixel_order
+        self.bpp = len(pixel_order)
+        self.pin = pin                                          # DigitalInOut, e.g. pixels.pin
+        self.buf = bytearray(count * self.bpp)
+        self.wire = np.frombuffer(self.buf, dtype=np.uint8).reshape((count, self.bpp))
+        self.red = pixel_order.index("R")                       # wire offsets of each channel
+        self.green = pixel_order.index("G")
+        self.blue = pixel_order.index("B")
+        self.flat = np.frombuffer(self.buf, dtype=np.uint8)
+        self._pattern_bytes = bytearray(self.bpp)               # one pixel in wire order, repeated by fill_rgb()
+        self._pattern = np.frombuffer(self._pattern_bytes, dtype=np.uint8)
+        self._pattern_index = np.frombuffer(bytes(range(self.bpp)) * count, dtype=np.uint8)
+        self._everything = slice(None)                          # made once; a [:] in show() would allocate one per frame
+
+        self.output = output
+        if output is not None:
+            self.out = bytearray(len(self.buf))                 # post-gamma bytes actually transmitted
+            self.out_flat = np.frombuffer(self.out, dtype=np.uint8)
+        else:
+            self.out = self.buf
+            if limiter is not None:
+                raise ValueError("a power limiter needs an output stage")
+        self.limiter = limiter
+
+        self.deep = None
+        self._deep_frame = False                                # last write went to the deep layer
+        if deep:
+            if output is None:
+                raise ValueError("a deep frame needs an output stage")
+            output.enable_deep()
+            size = len(self.buf)
+            self.deep_buf = bytearray(size * 2)
+            self.deep_flat = np.frombuffer(self.deep_buf, dtype=np.uint16)
+            self.deep = self.deep_flat.reshape((count, self.bpp))
+            # integer and fractional parts of the 8.8 values: the high (second, little-endian)
+            # and low bytes of each
+            deep_bytes = np.frombuffer(self.deep_buf, dtype=np.uint8).reshape((size, 2))
+            self._deep_high = deep_bytes[:, 1]
+            self._deep_low = deep_bytes[:, 0]
+            self._step_index = np.array([i * DEEP_STEPS for i in range(256)], dtype=np.uint16)
+            self._fraction_index = np.array([i * DEEP_STEPS // 256 for i in range(256)], dtype=np.uint16)
+            self._table_index = np.zeros(size, dtype=np.uint16)     # table16 entry of each deep value
+            self._pattern16 = np.zeros(self.bpp, dtype=np.uint16)
+            self._dither_buf = bytearray(size * 2)             # gamma'd 8.8 output plus threshold
+            self._dither = np.frombuffer(self._dither_buf, dtype=np.uint16)
+            self._dither_bytes = np.frombuffer(self._dither_buf, dtype=np.uint8)
+            self._dither_high = np.array(range(1, size * 2, 2), dtype=np.uint16)
+            # any DITHER_FRAMES consecutive thresholds are the DITHER_FRAMES levels in some
+            # order, so frame k reads the window starting at k and every byte cycles through all of them
+            step = 256 // DITHER_FRAMES
+            thresholds = bytearray(size + DITHER_FRAMES)
+            for i in range(len(thresholds)):
+                thresholds[i] = (i * 7 % DITHER_FRAMES) * step + step // 2
+            self._thresholds = [np.frombuffer(thresholds, dtype=np.uint8, count=size, offset=k)
+                                for k in range(DITHER_FRAMES)]
+            self._dither_phase = 0
+        self._solid16 = array("H", [0] * 3)                     # r, g, b of the current fill_rgb16() solid
+        self._deep_solid = False
+        self._deep_held = False                                 # that solid is on the strip and needs no dithering
+        self._sent_version = 0
+
+        self.min_refresh = min_refresh
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.last_sent = 0.0
+        self._sent = bytearray(len(self.buf))                   # working frame as of the last transmission
+        self._sent_valid = False
+        self._solid = -1                                        # packed color of the current frame if it is a plain fill
+        self._sent_solid = -1
+
+    def __len__(self):
+        return self.count
+
+    def mark_dirty(self):
+        self._solid = -1
+        self._deep_frame = False
+        self._deep_solid = False
+
+    def fill(self, color):
+        r, g, b = color
+        self.fill_rgb(r, g, b)
+
+    def fill_rgb(self, r, g, b):
+        """fill() from separate channels, for callers that should not build a tuple."""
+        packed = (r << 16) | (g << 8) | b
+        if packed == self._solid:
+            return                                              # already filled with this color
+        pattern = self._pattern_bytes
+        pattern[self.red] = r
+        pattern[self.green] = g
+        pattern[self.blue] = b
+        np.take(self._pattern, self._pattern_index, out=self.flat)
+        self._solid = packed
+        self._deep_frame = False
+
+    def fill_range(self, start, stop, color):
+        self._solid = -1
+        self._deep_frame = False
+        r, g, b = color
+        self.wire[start:stop, self.red] = r
+        self.wire[start:stop, self.green] = g
+        self.wire[start:stop, self.blue] = b
+
+    def set_pixel(self, index, color):
+        self._solid = -1
+        self._deep_frame = False
+        offset = index * self.bpp
+        self.buf[offset + self.red] = color[0]
+        self.buf[offset + self.green] = color[1]
+        self.buf[offset + self.blue] = color[2]
+
+    def load(self, rgb):
+        """Copy an (n, 3) RGB array, already clamped to 0-255, into wire order."""
+        self._solid = -1
+        self._deep_frame = False
+        self.wire[:, self.red] = rgb[:, 0]
+        self.wire[:, self.green] = rgb[:, 1]
+        self.wire[:, self.blue] = rgb[:, 2]
+
+    def load_wire(self, data):
+        """Copy bytes already in this frame's wire order, e.g. a prerendered frame."""
+        self._solid = -1
+        self._deep_frame = False
+        self.buf[self._everything] = data
+
+    def load_deep(self, rgb16):
+        """Copy an (n, 3) uint16 RGB array in 8.8 fixed point (0-255.0) into the deep layer."""
+        self._solid = -1
+        self._deep_frame = True
+        self._deep_solid = False
+        self._deep_held = False
+        self.deep[:, self.red] = rgb16[:, 0]
+        self.deep[:, self.green] = rgb16[:, 1]
+        self.deep[:, self.blue] = rgb16[:, 2]
+
+    def fill_rgb16(self, r, g, b):
+        """fill_rgb() into the deep layer, channels in 8.8 fixed point."""
+        solid = self._solid16
+        if self._deep_frame and self._deep_solid and r == solid[0] and g == solid[1] and b == solid[2]:
+            return                                              # already filled with this color
+        solid[0] = r
+        solid[1] = g
+        solid[2] = b
+        self._solid = -1
+        self._deep_frame = True
+        self._deep_solid = True
+        self._deep_held = False
+        pattern = self._pattern16
+        pattern[self.red] = r
+        pattern[self.green] = g
+        pattern[self.blue] = b
+        np.take(pattern, self._pattern_index, out=self.deep_flat)
+
+    def _dither_out(self):
+        """Deep layer -> gamma at 16 bits -> add this frame's thresholds -> high bytes to out."""
+        np.take(self._step_index, self._deep_high, out=self._table_index)
+        np.take(self._fraction_index, self._deep_low, out=self._dither)     # _dither is scratch until the gamma lookup
+        self._table_index += self._dither
+        np.take(self.output.table16, self._table_index, out=self._dither)
+        self._dither += self._thresholds[self._dither_phase]
+        np.take(self._dither_bytes, self._dither_high, out=self.out_flat)
+
+    def _exact16(self, value):
+        """True if an 8.8 channel value dithers to the same output byte at every threshold."""
+        entry = self.output.table16[(value >> 8) * DEEP_STEPS + (value & 0xFF) * DEEP_STEPS // 256]
+        fraction = entry & 0xFF
+        half_step = 128 // DITHER_FRAMES                        # lowest threshold; the highest is 256 - half_step
+        return fraction < half_step or fraction >= 256 - half_step
+
+    def _held(self, now):
+        """True if the deep frame is a solid already on the strip with nothing to dither."""
+        return (self._deep_held and self.output.version == self._sent_version
+                and (self.min_refresh is None or now - self.last_sent < self.min_refresh))
+
+    def changed(self):
+        """True if the frame differs from the last one sent to the strip."""
+        if not self._sent_valid:
+            return True
+        if self.output is not None and self.output.version != self._sent_version:
+            return True
+        if self._solid >= 0:
+            return self._solid != self._sent_solid
+        return self.buf != self._sent
+
+    def show(self, now=None):
+        """Write the frame if it changed (or min_refresh ran out). Returns True if written."""
+        if now is None:
+            now = time.monotonic()
+        deep = self._deep_frame
+        if deep:
+            if self._held(now):
+                self.frames_skipped += 1
+                return False
+        elif not self.changed():
+            if self.min_refresh is None or now - self.last_sent < self.min_refresh:
+                self.frames_skipped += 1
+                return False
+        self._prepare(deep)
+        neopixel_write(self.pin, self.out)
+        self._mark_sent(now, deep)
+        return True
+
+    def _prepare(self, deep):
+        """Fill out with the bytes to transmit for the current frame."""
+        if deep:
+            self._dither_out()
+            if self.limiter is not None and self.limiter.check(self.out_flat, self.output):
+                self._dither_out()                              # table was rescaled to fit the budget
+            self._dither_phase += 1
+            if self._dither_phase == DITHER_FRAMES:
+                self._dither_phase = 0
+        elif self.output is not None:
+            self.output.apply(self.flat, self.out_flat)
+            if self.limiter is not None and self.limiter.check(self.out_flat, self.output):
+                self.output.apply(self.flat, self.out_flat)     # table was rescaled to fit the budget
+        if self.output is not None:
+            self._sent_version = self.output.version
+
+    def _mark_sent(self, now, deep):
+        self._sent[self._everything] = self.buf
+        self._sent_valid = not deep                             # the 8-bit copy says nothing about a dithered frame
+        solid = self._solid16
+        self._deep_held = (deep and self._deep_solid and self._exact16(solid[0])
+                           and self._exact16(solid[1]) and self._exact16(solid[2]))
+        self._sent_solid = self._solid
+        self.last_sent = now
+        self.frames_sent += 1
+
+class MultiFrameBuffer(FrameBuffer):
+    """
+    One logical frame split across several strips on their own data pins.
+
+    strips is a sequence of (pin, count, pixel_order); pixels are numbered
+    through the strips in that order, and pin is a board pin or an output
+    DigitalInOut. Effects draw into the whole frame exactly as into a
+    FrameBuffer, in the first strip's pixel order. Each strip is sent its
+    own memoryview slice of the output, so nothing is copied per strip. A
+    strip whose pixel order differs has its bytes rearranged by one
+    np.take over the whole output, through an index built at startup.
+
+    show() compares each strip's slice with what that strip was last sent
+    and writes only the strips that changed; solid fills, table changes,
+    dithered frames and min_refresh resend every strip. neopixel_write()
+    blocks, so the strips go out one after another and only skipping saves
+    wire time.
+    """
+
+    def __init__(self, strips, min_refresh=None, output=None, limiter=None, deep=False):
+        pixel_order = strips[0][2]
+        count = 0
+        for _, length, order in strips:
+            if len(order) != len(pixel_order):
+                raise ValueError("strips must all have the same bytes per pixel")
+            count += length
+        super().__init__(count, pixel_order, None, min_refresh, output, limiter, deep)
+
+        self.pins = []
+        for pin, _, _ in strips:
+            if not hasattr(pin, "direction"):
+                pin = digitalio.DigitalInOut(pin)
+                pin.direction = digitalio.Direction.OUTPUT
+            self.pins.append(pin)
+        self.strip_count = len(strips)
+        self.strip_sent = array("L", [0] * self.strip_count)
+        self.strip_skipped = array("L", [0] * self.strip_count)
+        self._dirty = bytearray(self.strip_count)
+
+        bpp = self.bpp
+        reorder = None
+        start = 0
+        for _, length, order in strips:
+            if order != pixel_order:
+                if reorder is None:
+                    reorder = list(range(count * bpp))
+                for i in range(start, start + length):
+                    for channel in range(bpp):          # wire byte for this channel <- same channel in frame order
+                        reorder[i * bpp + order.index(pixel_order[channel])] = i * bpp + channel
+            start += length
+        if reorder is not None:
+            if self.out is self.buf:
+                self.out_flat = self.flat                       # no output stage: take straight from the frame
+            self._reorder = np.array(reorder, dtype=np.uint16)
+            self._wire_out = bytearray(len(self.buf))
+            self._wire_out_flat = np.frombuffer(self._wire_out, dtype=np.uint8)
+        else:
+            self._reorder = None
+            self._wire_out = self.out
+
+        buf = memoryview(self.buf)
+        sent = memoryview(self._sent)
+        wire_out = memoryview(self._wire_out)
+        self._buf_views = []
+        self._sent_views = []
+        self._out_views = []
+        start = 0
+        for _, length, _ in strips:
+            first, end = start * bpp, (start + length) * bpp
+            self._buf_views.append(buf[first:end])
+            self._sent_views.append(sent[first:end])
+            self._out_views.append(wire_out[first:end])
+            start += length
+
+    def show(self, now=None):
+        """Write the strips whose part of the frame changed. Returns True if any was written."""
+        if now is None:
+            now = time.monotonic()
+        deep = self._deep_frame
+        if deep and self._held(now):
+            return self._skip_all()
+        everything = (deep or not self._sent_valid
+                      or (self.min_refresh is not None and now - self.last_sent >= self.min_refresh)
+                      or (self.output is not None and self.output.version != self._sent_version))
+        if not everything and self._solid >= 0:
+            if self._solid == self._sent_solid:
+                return self._skip_all()
+            everything = True
+        dirty = self._dirty
+        any_dirty = False
+        for k in range(self.strip_count):
+            dirty[k] = everything or self._buf_views[k] != self._sent_views[k]
+            any_dirty = any_dirty or dirty[k]
+        if not any_dirty:
+            return self._skip_all()
+
+        version = self.output.version if self.output is not None else 0
+        self._prepare(deep)
+        if self.output is not None and self.output.version != version:
+            everything = True                                   # limiter rescaled the table: resend it all
+        if self._reorder is not None:
+            np.take(self.out_flat, self._reorder, out=self._wire_out_flat)
+        for k in range(self.strip_count):
+            if everything or dirty[k]:
+                neopixel_write(self.pins[k], self._out_views[k])
+                self.strip_sent[k] += 1
+            else:
+                self.strip_skipped[k] += 1
+        self._mark_sent(now, deep)
+        return True
+
+    def _skip_all(self):
+        for k in range(self.strip_count):
+            self.strip_skipped[k] += 1
+        self.frames_skipped += 1
+        return False
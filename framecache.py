@@ -0,0 +1,112 @@
+# framecache.py
+
+class FrameSequence:
+    """
+    A prerendered animation: frames frames of frame_bytes wire-order bytes,
+    each a window into one store. Frame k starts at byte first + k * stride,
+    so a sequence of distinct frames (packed()) and a pattern that only moves
+    along the strip (rotation(), wipes()) are the same thing with different
+    strides. A nonzero period wraps the start offset back into the first
+    period bytes, for a store that repeats itself (rotation()). Playing a
+    frame is a window into the store, not a render.
+    """
+
+    def __init__(self, store, frame_bytes, frames, first=0, stride=None, period=0):
+        self.store = store
+        self.view = memoryview(store)
+        self.frame_bytes = frame_bytes
+        self.frames = frames
+        self.first = first
+        self.stride = frame_bytes if stride is None else stride
+        self.period = period
+        self.nbytes = len(store)
+
+    def window(self, k):
+        """Frame k (wrapping) as a memoryview, e.g. for neopixel_write()."""
+        start = self.first + (k % self.frames) * self.stride
+        if self.period:
+            start %= self.period
+        return self.view[start:start + self.frame_bytes]
+
+    def play(self, frame, k):
+        """Copy frame k into a FrameBuffer of the same size."""
+        frame.load_wire(self.window(k))
+
+def _pixel(color, pixel_order):
+    """One pixel's wire bytes; channels beyond R, G and B (white) are left off."""
+    pixel = bytearray(len(pixel_order))
+    pixel[pixel_order.index("R")] = int(color[0])
+    pixel[pixel_order.index("G")] = int(color[1])
+    pixel[pixel_order.index("B")] = int(color[2])
+    return pixel
+
+def packed(frames, frame, draw):
+    """Render draw(frame, k) for every k into one store, frame after frame."""
+    size = len(frame.buf)
+    store = bytearray(size * frames)
+    for k in range(frames):
+        draw(frame, k)
+        store[k * size:(k + 1) * size] = frame.buf
+    return FrameSequence(store, size, frames)
+
+def rotation(base, bpp, shift=1):
+    """
+    base (one frame of wire bytes) scrolled toward pixel 0 by shift pixels a
+    frame. The store is base twice over, so every rotation is a contiguous
+    window; with shift > 1 the start wraps at len(base) to stay in it.
+    """
+    count = len(base) // bpp
+    frames = 1
+    while frames * shift % count:
+        frames += 1
+    return FrameSequence(bytearray(base) + bytearray(base), len(base), frames, 0, shift * bpp, len(base))
+
+def wipes(colors, count, pixel_order):
+    """
+    Each color in turn filling the strip from pixel 0, one pixel a frame,
+    over the color before it (the last color is wiped over by the first).
+    The store holds each color once plus one more block, about (len(colors)
+    + 1) * count pixels, instead of len(colors) * count separate frames.
+    """
+    bpp = len(pixel_order)
+    blocks = len(colors)
+    store = bytearray()
+    for i in range(blocks):                                     # last color first, ending in colors[0]...
+        store += _pixel(colors[blocks - 1 - i], pixel_order) * count
+    store += _pixel(colors[-1], pixel_order) * count            # ...then the last color again to wrap around
+    frames = blocks * count
+    return FrameSequence(store, count * bpp, frames, (frames - 1) * bpp, -bpp)
+
+class FrameCache:
+    """
+    Prerendered FrameSequences by name, within a RAM budget in bytes. get()
+    builds a missing sequence, then evicts the least recently played ones
+    until the resident total fits, so while it builds the heap briefly holds
+    one sequence more than the budget.
+    """
+
+    def __init__(self, budget=32768):
+        self.budget = budget
+        self.entries = {}                                       # name -> [sequence, last use]
+        self.uses = 0
+        self.resident = 0                                       # bytes held by cached sequences
+        self.builds = 0
+        self.evictions = 0
+
+    def get(self, name, build):
+        self.uses += 1
+        entry = self.entries.get(name)
+        if entry is None:
+            sequence = build()
+            if sequence.nbytes > self.budget:
+                raise ValueError("sequence %r needs %d bytes, budget is %d" % (name, sequence.nbytes, self.budget))
+            while self.resident + sequence.nbytes > self.budget:
+                oldest = min(self.entries, key=lambda key: self.entries[key][1])
+                self.resident -= self.entries.pop(oldest)[0].nbytes
+                self.evictions += 1
+            entry = [sequence, 0]
+            self.entries[name] = entry
+            self.resident += sequence.nbytes
+            self.builds += 1
+        entry[1] = self.uses
+        return entry[0]
@@ -0,0 +1,83 @@
+# governor.py
+
+class FrameGovernor:
+    """
+    Fixed-rate frame scheduling against deadlines.
+
+    Frame k is due to finish by start + (k + 1) * period. begin() returns the
+    frame's scheduled start, which advances by exactly one period per frame,
+    so effects animate with a steady dt whatever jitter the loop sees. end()
+    returns how long to wait before the next frame. A frame that finishes
+    after its deadline is counted as late. Whole periods that pass while it
+    runs are counted as dropped and skipped rather than rendered in a burst.
+
+    quality runs from max_quality down to 0. It drops one level after
+    downgrade_after late frames in a row, and rises one level again after
+    upgrade_after frames in a row that used less than half their period.
+    """
+
+    def __init__(self, fps, max_quality=2, downgrade_after=5, upgrade_after=250):
+        self.fps = fps
+        self.period = 1.0 / fps
+        self.dt = self.period                                   # animation time since the previous frame
+        self.max_quality = max_quality
+        self.quality = max_quality
+        self.downgrade_after = downgrade_after
+        self.upgrade_after = upgrade_after
+        self.frames = 0
+        self.late = 0
+        self.dropped = 0
+        self.frame_start = None                                 # scheduled start of the current frame
+        self.worst_lateness = 0.0
+        self.lateness = 0.0                                     # how far past its deadline the last frame ended
+        self._late_streak = 0
+        self._easy_streak = 0
+        self._began = 0.0
+
+    def begin(self, now):
+        """Start a frame and return its animation time."""
+        if self.frame_start is None:
+            self.frame_start = now
+        self._began = now
+        return self.frame_start
+
+    def end(self, now):
+        """Finish the frame; returns seconds to sleep until the next one is due."""
+        self.frames += 1
+        deadline = self.frame_start + self.period
+        next_start = deadline
+        self.lateness = 0.0
+        if now > deadline:
+            self.late += 1
+            lateness = now - deadline
+            self.lateness = lateness
+            if lateness > self.worst_lateness:
+                self.worst_lateness = lateness
+            missed = int(lateness / self.period)
+            if missed:
+                self.dropped += missed
+                next_start += missed * self.period
+            self._late_streak += 1
+            self._easy_streak = 0
+            if self._late_streak >= self.downgrade_after and self.quality > 0:
+                self.quality -= 1
+                self._late_streak = 0
+        else:
+            self._late_streak = 0
+            if now - self._began < self.period / 2:
+                self._easy_streak += 1
+                if self._easy_streak >= self.upgrade_after and self.quality < self.max_quality:
+                    self.quality += 1
+                    self._easy_streak = 0
+            else:
+                self._easy_streak = 0
+
+        self.dt = next_start - self.frame_start
+        self.frame_start = next_start
+        delay = next_start - now
+        return delay if delay > 0 else 0
+
+    def report(self):
+        print("\n---- FRAMES: target %d fps, %d frames, %d late, %d dropped, worst %.1f ms late, quality %d/%d ----" % (
+            self.fps, self.frames, self.late, self.dropped, self.worst_lateness * 1000,
+            self.quality, self.max_quality))
@@ -0,0 +1,47 @@
+# helix.py
+
+import math
+from ulab import numpy as np
+
+class Helix:
+    """
+    Geometry of the strip wound as a helix, computed once at boot so effects
+    can use whole-array expressions instead of per-frame trigonometry.
+
+    Index 0 is the top of the strip (as in effects.fire), so position counts
+    up from the bottom LED. An LED's place on the helix is its angle and
+    height; anything in 3D follows from those two. Float arrays, one entry
+    per LED:
+      angle    angle around the axis in radians, unwrapped (bottom LED = 0)
+      height   0.0 at the bottom LED up to 1.0 at the top
+    Fixed-point arrays (uint8), for table lookups and integer math:
+      angle8   fraction of a turn, 256 = one full turn
+      height8  0 at the bottom up to 255 at the top
+    """
+
+    def __init__(self, pixel_count, turns):
+        self.pixel_count = pixel_count
+        self.turns = turns
+        self.angle_step = 2 * math.pi * turns / pixel_count      # radians between neighbouring LEDs
+
+        from_bottom = (pixel_count - 1) - np.arange(pixel_count, dtype=np.float)
+        self.angle = from_bottom * self.angle_step
+        self.height = from_bottom / max(1, pixel_count - 1)
+
+        self.angle8_bytes = bytearray(pixel_count)
+        self.height8_bytes = bytearray(pixel_count)
+        for i in range(pixel_count):
+            position = pixel_count - 1 - i
+            turn = position * turns / pixel_count
+            self.angle8_bytes[i] = int((turn - int(turn)) * 256) & 0xFF
+            self.height8_bytes[i] = position * 255 // max(1, pixel_count - 1)
+        self.angle8 = np.frombuffer(self.angle8_bytes, dtype=np.uint8)
+        self.height8 = np.frombuffer(self.height8_bytes, dtype=np.uint8)
+
+    def column(self, values):
+        """Reshape a per-LED array to (n, 1) so it broadcasts across R, G and B."""
+        return values.reshape((self.pixel_count, 1))
+
+    def stripes(self, count, phase):
+        """0.0-1.0 intensity of count stripes around the helix, rotated by phase radians."""
+        return 0.5 + 0.5 * np.cos(self.angle * count - phase)
@@ -7,27 +7,34 @@ import time
 import board
 from rainbowio import colorwheel
 import neopixel
+import framecache
+from effects import rainbow_frame
+from framebuffer import FrameBuffer
 
 pixel_pin = board.A1
 num_pixels = 250
 
 pixels = neopixel.NeoPixel(pixel_pin, num_pixels, brightness=1, auto_write=False) # was 0.3
+frame = FrameBuffer(num_pixels, neopixel.GRB, pixels.pin)   # prerendered frames go out through this
+cache = framecache.FrameCache(16384)
 
 
-def color_chase(color, wait):
-    for i in range(num_pixels):
-        pixels[i] = color
+def color_chases(colors, wait):
+    """Wipe each color over the strip in turn, played from one prerendered store."""
+    chases = cache.get(colors, lambda: framecache.wipes(colors, num_pixels, neopixel.GRB))
+    for k in range(chases.frames):
+        chases.play(frame, k)
         time.sleep(wait)
-        pixels.show()
-    time.sleep(0)
+        frame.show()
 
 
 def rainbow_cycle(wait):
-    for j in range(255):
-        for i in range(num_pixels):
-            rc_index = (i * 256 // num_pixels) + j
-            pixels[i] = colorwheel(rc_index & 255)
-        pixels.show()
+    # one frame rendered once and scrolled a pixel per step, instead of
+    # colorwheel() for every pixel of every step
+    rainbow = cache.get("rainbow", lambda: framecache.rotation(rainbow_frame(num_pixels, neopixel.GRB), 3))
+    for j in range(rainbow.frames):
+        rainbow.play(frame, j)
+        frame.show()
         time.sleep(wait)
 
 
@@ -85,28 +92,12 @@ while True:
     pixels.show()
     time.sleep(1.5)
 
-    color_chase(RED, CHANGE_SPEED)  # Increase the number to slow down the color chase
-    color_chase(ORANGE, CHANGE_SPEED)
-    color_chase(YELLOW, CHANGE_SPEED)
-    color_chase(GREEN, CHANGE_SPEED)
-    color_chase(CYAN, CHANGE_SPEED)
-    color_chase(BLUE, CHANGE_SPEED)
-    color_chase(PURPLE, CHANGE_SPEED)
-    color_chase(BURGUNDY, CHANGE_SPEED)
-    color_chase(PINK, CHANGE_SPEED)   
-    color_chase(WHITE, CHANGE_SPEED)
-    color_chase(BROWN, CHANGE_SPEED)
+    color_chases((RED, ORANGE, YELLOW, GREEN, CYAN, BLUE, PURPLE, BURGUNDY, PINK, WHITE, BROWN),
+                 CHANGE_SPEED)  # Increase the number to slow down the color chase
 
     rainbow_cycle(0.03)  # Increase the number to slow down the rainbow
 
     
     while True:
-        color_chase(RED, CHANGE_SPEED)  # Increase the number to slow down the color chase
-        color_chase(ORANGE, CHANGE_SPEED)
-        color_chase(YELLOW, CHANGE_SPEED)
-        color_chase(GREEN, CHANGE_SPEED)
-        color_chase(CYAN, CHANGE_SPEED)
-        color_chase(BLUE, CHANGE_SPEED)
-        color_chase(PURPLE, CHANGE_SPEED)
-        color_chase(BURGUNDY, CHANGE_SPEED)
-        color_chase(PINK, CHANGE_SPEED)   
+        color_chases((RED, ORANGE, YELLOW, GREEN, CYAN, BLUE, PURPLE, BURGUNDY, PINK),
+                     CHANGE_SPEED)  # Increase the number to slow down the color chase
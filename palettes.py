@@ -0,0 +1,86 @@
+# palettes.py
+
+from ulab import numpy as np
+from utils import hex_to_rgb
+
+GRADIENT_STEPS = 256
+
+_mix = np.zeros((GRADIENT_STEPS, 3), dtype=np.float)           # crossfade() scratch, shared: gradients are one size
+
+def build_gradient(palette, wrap=True):
+    """
+    Expand a palette of packed hex colors (see colors.py) into a bytearray of
+    GRADIENT_STEPS x RGB, linearly interpolated between the colors. With wrap
+    the last color blends back into the first, so cycling the gradient has
+    no seam.
+    """
+    colors = [hex_to_rgb(c) for c in palette]
+    segments = len(colors) if wrap else len(colors) - 1
+    span = GRADIENT_STEPS if wrap else GRADIENT_STEPS - 1
+    table = bytearray(GRADIENT_STEPS * 3)
+    for i in range(GRADIENT_STEPS):
+        position = i * segments / span
+        k = min(int(position), segments - 1)
+        frac = position - k
+        a = colors[k]
+        b = colors[(k + 1) % len(colors)]
+        for c in range(3):
+            table[i * 3 + c] = int(a[c] + (b[c] - a[c]) * frac + 0.5)
+    return table
+
+def gradient_array(table):
+    """(GRADIENT_STEPS, 3) uint8 ulab view of a gradient bytearray; shares its memory."""
+    return np.frombuffer(table, dtype=np.uint8).reshape((GRADIENT_STEPS, 3))
+
+def sample(gradient, indices, out=None):
+    """
+    Colors for a whole frame in one indexed lookup: indices is an integer
+    ulab array of gradient positions (0-255), the result an (n, 3) array
+    ready for FrameBuffer.load(). Pass a preallocated (n, 3) uint8 out to
+    sample without allocating.
+    """
+    if out is None:
+        return np.take(gradient, indices, axis=0)
+    np.take(gradient, indices, axis=0, out=out)
+    return out
+
+def crossfade(gradient_a, gradient_b, amount, out=None):
+    """
+    Blend two gradients (amount 0.0 = a, 1.0 = b). The blend is done in
+    place in a preallocated float scratch and written into out, a (256, 3)
+    uint8 array, or a new one if out is None.
+    """
+    if out is None:
+        out = np.zeros((GRADIENT_STEPS, 3), dtype=np.uint8)
+    mix = _mix
+    mix[:] = gradient_b
+    mix -= gradient_a
+    mix *= amount
+    mix += gradient_a
+    mix += 0.5
+    out[:] = mix
+    return out
+
+class PaletteCache:
+    """
+    Built gradients keyed by palette. At most max_resident stay in RAM
+    (768 bytes each); get() on a new palette evicts the least recently used.
+    """
+
+    def __init__(self, max_resident=4, wrap=True):
+        self.max_resident = max_resident
+        self.wrap = wrap
+        self.entries = {}                                       # palette -> [gradient array, last use]
+        self.uses = 0
+
+    def get(self, palette):
+        self.uses += 1
+        entry = self.entries.get(palette)
+        if entry is None:
+            if len(self.entries) >= self.max_resident:
+                oldest = min(self.entries, key=lambda key: self.entries[key][1])
+                del self.entries[oldest]
+            entry = [gradient_array(build_gradient(palette, self.wrap)), 0]
+            self.entries[palette] = entry
+        entry[1] = self.uses
+        return entry[0]
@@ -0,0 +1,181 @@
+# playlist.py
+
+import random
+import time
+from ulab import numpy as np
+from framebuffer import FrameBuffer
+
+# Effect registry: name -> factory(). A factory returns an object with
+# step(frame, now) that draws one frame and returns False once it has
+# finished early (e.g. a lightning strike). An optional start(now) is called
+# each time the effect comes up in a playlist.
+EFFECTS = {}
+
+def register(name, factory):
+    EFFECTS[name] = factory
+
+class Playlist:
+    """
+    Entries of (effect name, duration seconds, weight). In order by default;
+    with shuffle, each next entry is drawn at random in proportion to weight
+    from the entries other than the current one, so an entry never follows itself.
+    """
+
+    def __init__(self, entries, shuffle=False):
+        self.entries = entries
+        self.shuffle = shuffle
+        self.index = -1
+        self.total_weight = sum(entry[2] for entry in entries)
+
+    def next(self):
+        if self.shuffle:
+            current = self.index if len(self.entries) > 1 else -1
+            weight = self.total_weight - (self.entries[current][2] if current >= 0 else 0)
+            pick = random.random() * weight
+            chosen = current
+            for i, entry in enumerate(self.entries):
+                if i == current:
+                    continue
+                chosen = i                                      # the last candidate catches float rounding
+                pick -= entry[2]
+                if pick < 0:
+                    break
+            self.index = chosen
+        else:
+            self.index = (self.index + 1) % len(self.entries)
+        return self.entries[self.index]
+
+class Sequencer:
+    """
+    Plays a Playlist into a FrameBuffer. Each effect is built once from the
+    registry and reused. During a crossfade both effects draw into scratch
+    frames that are blended into the output with integer weights out of 256,
+    through preallocated uint16 arrays, so a fade allocates nothing. Every
+    effect step is timed against budget seconds, and overruns are counted
+    per effect so report() shows which effects cannot hold the frame rate.
+    set_quality() is passed on to every effect that has a set_quality().
+    If the next entry names the effect already playing, it carries on
+    without a crossfade (restarted only if it had finished), since one
+    instance cannot draw both sides of a fade.
+    """
+
+    def __init__(self, frame, playlist, crossfade=1.0, budget=0.02):
+        self.frame = frame
+        self.playlist = playlist
+        self.crossfade = crossfade
+        self.budget_us = int(budget * 1000000)
+        self.scratch_a = FrameBuffer(len(frame), frame.pixel_order)
+        self.scratch_b = FrameBuffer(len(frame), frame.pixel_order)
+        size = len(frame.buf)
+        self._levels = np.array(range(256), dtype=np.uint16)   # byte -> uint16, through np.take
+        self._blend_buf = bytearray(size * 2)
+        self._blend = np.frombuffer(self._blend_buf, dtype=np.uint16)
+        self._blend_bytes = np.frombuffer(self._blend_buf, dtype=np.uint8)
+        self._blend_high = np.array(range(1, size * 2, 2), dtype=np.uint16)   # high (little-endian) bytes
+        self._incoming = np.zeros(size, dtype=np.uint16)
+        self.instances = {}
+        self.stats = {}                                         # name -> [frames, total us, max us, overruns]
+        self.running = False
+        self.current = None
+        self.incoming = None
+        self.current_end = 0.0
+        self.fade_start = 0.0
+        self.quality = None                                     # (level, max level) once set
+
+    def _effect(self, name, now):
+        effect = self.instances.get(name)
+        if effect is None:
+            effect = EFFECTS[name]()
+            if self.quality is not None and hasattr(effect, "set_quality"):
+                effect.set_quality(*self.quality)
+            self.instances[name] = effect
+            self.stats[name] = [0, 0, 0, 0]
+        if hasattr(effect, "start"):
+            effect.start(now)
+        return effect
+
+    def start(self, now):
+        name, duration, _ = self.playlist.next()
+        self.current = (name, self._effect(name, now))
+        self.current_end = now + duration
+        self.incoming = None
+        self.running = True
+
+    def set_quality(self, level, max_level):
+        if self.quality is not None and self.quality[0] == level and self.quality[1] == max_level:
+            return                                              # called every frame; no tuple unless it changed
+        self.quality = (level, max_level)
+        for effect in self.instances.values():
+            if hasattr(effect, "set_quality"):
+                effect.set_quality(level, max_level)
+
+    def stop(self):
+        self.running = False
+        self.current = None
+        self.incoming = None
+
+    def _timed_step(self, entry, frame, now):
+        name, effect = entry
+        started = time.monotonic_ns()
+        alive = effect.step(frame, now)
+        elapsed_us = (time.monotonic_ns() - started) // 1000
+        stats = self.stats[name]
+        stats[0] += 1
+        stats[1] += elapsed_us
+        if elapsed_us > stats[2]:
+            stats[2] = elapsed_us
+        if elapsed_us > self.budget_us:
+            stats[3] += 1
+        return alive is not False
+
+    def _advance(self, now, alive):
+        name, duration, _ = self.playlist.next()
+        self.current_end = now + self.crossfade + duration
+        if name == self.current[0]:                             # same instance: no fade, keep stepping it once a frame
+            effect = self.current[1]
+            if not alive and hasattr(effect, "start"):
+                effect.start(now)
+            return
+        # the outgoing effect carries on from the frame it drew, the incoming one from black:
+        # neither may start from what a previous crossfade left in the scratch frames
+        self.scratch_a.buf[:] = self.frame.buf
+        self.scratch_a.mark_dirty()
+        self.scratch_b.fill((0, 0, 0))
+        self.scratch_b.mark_dirty()
+        self.incoming = (name, self._effect(name, now))
+        self.fade_start = now
+
+    def step(self, now):
+        if not self.running:
+            return False
+
+        if self.incoming is None:
+            alive = self._timed_step(self.current, self.frame, now)
+            if not alive or now >= self.current_end - self.crossfade:
+                self._advance(now, alive)
+            return True
+
+        amount = (now - self.fade_start) / self.crossfade if self.crossfade > 0 else 1.0
+        if amount >= 1.0:
+            self.current = self.incoming
+            self.incoming = None
+            return self.step(now)
+
+        self._timed_step(self.current, self.scratch_a, now)
+        self._timed_step(self.incoming, self.scratch_b, now)
+        weight = int(amount * 256)
+        np.take(self._levels, self.scratch_a.flat, out=self._blend)
+        self._blend *= 256 - weight
+        np.take(self._levels, self.scratch_b.flat, out=self._incoming)
+        self._incoming *= weight
+        self._blend += self._incoming                           # at most 255 * 256: no overflow
+        np.take(self._blend_bytes, self._blend_high, out=self.frame.flat)
+        self.frame.mark_dirty()
+        return True
+
+    def report(self):
+        print("\n---- EFFECTS: step time against a %dus budget ----" % self.budget_us)
+        for name, (frames, total_us, max_us, overruns) in self.stats.items():
+            if frames:
+                print("     - %-10s frames=%-6d avg=%6dus max=%6dus overruns=%d" % (
+                    name, frames, total_us // frames, max_us, overruns))
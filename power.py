@@ -0,0 +1,105 @@
+# power.py
+
+from ulab import numpy as np
+
+class PowerLimiter:
+    """
+    Keeps the strip's estimated current under budget_ma.
+
+    The estimate comes from the bytes actually sent (after gamma and
+    brightness): each channel draws channel_ma at 255 and proportionally
+    less below it, plus idle_ma per pixel. The bytes are turned into levels
+    with one np.take into a preallocated float array, scaled in place by
+    per-byte channel currents and summed with np.sum, so nothing is looped
+    over in Python or allocated per frame.
+
+    When a frame is over budget, check() lowers the output stage's limit to
+    the largest multiple of 1/steps that fits, and the frame is output again
+    through the rescaled table. Steps down are judged on the frame as sent,
+    and the limit only rises again once frames fit under budget_ma less a
+    hysteresis fraction of it, so a frame sitting right at the budget does
+    not flip between two steps. While any light fits, the limit stays at
+    least one step: a frame output at limit 0 is all dark and says nothing
+    about how bright it would be. A budget below the idle draw fits no light
+    at all and holds the limit at 0.
+    Table rebuilds only happen when the limit changes step.
+    """
+
+    def __init__(self, budget_ma, pixel_count, pixel_order="GRB", channel_ma=(20.0, 20.0, 20.0),
+                 idle_ma=1.0, steps=32, hysteresis=0.05):
+        self.budget_ma = budget_ma
+        self.idle_ma = idle_ma * pixel_count
+        self.steps = steps
+        self.hysteresis_ma = budget_ma * hysteresis
+        bpp = len(pixel_order)
+        self.level_table = np.array([i / 255 for i in range(256)], dtype=np.float)
+        self.levels = np.zeros(pixel_count * bpp, dtype=np.float)
+        pixel = [0.0] * bpp
+        pixel[pixel_order.index("R")] = channel_ma[0]
+        pixel[pixel_order.index("G")] = channel_ma[1]
+        pixel[pixel_order.index("B")] = channel_ma[2]
+        self.weights = np.array(pixel * pixel_count, dtype=np.float)   # mA at full level, per wire byte
+        self.frames = 0
+        self.throttled = 0                                      # frames sent with the limit below 1
+        self.estimate_ma = 0.0                                  # unthrottled estimate of the last frame
+        self.peak_ma = 0.0
+        self.lowest_limit = 1.0
+
+    def estimate(self, out_flat):
+        """Estimated mA for these output bytes."""
+        np.take(self.level_table, out_flat, out=self.levels)
+        self.levels *= self.weights
+        return self.idle_ma + np.sum(self.levels)
+
+    def _fit(self, full, budget_ma):
+        """Largest limit step at which a frame drawing full mA unthrottled stays under budget_ma."""
+        if self.idle_ma + full <= budget_ma:
+            return 1.0
+        available = budget_ma - self.idle_ma
+        if available <= 0:
+            return 0.0                                          # the idle draw alone is over budget
+        step = int(available / full * self.steps)
+        return (step if step > 1 else 1) / self.steps
+
+    def check(self, out_flat, output):
+        """
+        Estimate a frame output through output (an OutputStage). Returns True
+        if output's limit changed and the frame must be output again.
+        """
+        self.frames += 1
+        drawn = self.estimate(out_flat) - self.idle_ma
+        limit = output.limit
+        full = drawn / limit if limit > 0 else drawn            # what the frame would draw unthrottled
+        self.estimate_ma = self.idle_ma + full
+        if self.estimate_ma > self.peak_ma:
+            self.peak_ma = self.estimate_ma
+
+        wanted = limit
+        if self.idle_ma + drawn > self.budget_ma:               # the frame as sent is over: step down
+            fits = self._fit(full, self.budget_ma)
+            if fits < limit:
+                wanted = fits
+        elif limit < 1.0:                                       # rise only with hysteresis_ma to spare
+            fits = self._fit(full, self.budget_ma - self.hysteresis_ma)
+            if fits > limit:
+                wanted = fits
+        changed = wanted != limit
+        if changed:
+            output.set_limit(wanted)
+        if wanted < 1.0:
+            self.throttled += 1
+            if wanted < self.lowest_limit:
+                self.lowest_limit = wanted
+        return changed
+
+    def reset(self):
+        self.frames = 0
+        self.throttled = 0
+        self.peak_ma = 0.0
+        self.lowest_limit = 1.0
+
+    def report(self):
+        """Print throttling since the last report, then start a new window."""
+        print("\n---- POWER: budget %d mA, peak %d mA, throttled %d of %d frames, lowest limit %d%% ----" % (
+            self.budget_ma, self.peak_ma, self.throttled, self.frames, self.lowest_limit * 100))
+        self.reset()
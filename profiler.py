@@ -0,0 +1,116 @@
+# profiler.py
+
+import gc
+import time
+from array import array
+
+# Stage indices for the kiosk loop
+SENSOR = 0
+COMPUTE = 1
+RENDER = 2
+SHOW = 3
+TELEMETRY = 4
+STAGE_NAMES = ("sensor", "compute", "render", "show", "telemetry")
+
+# Bucket 0 holds durations under 1 us; bucket k holds [2^(k-1), 2^k) us.
+# 24 buckets reach past 8 seconds.
+BUCKETS = 24
+
+class StageProfiler:
+    """
+    Per-stage timing with fixed-memory log2 histograms.
+
+    Wrap each stage in start(stage) / stop(stage). Every counter lives in a
+    preallocated array, so recording a sample does not allocate. The one
+    exception is the time.monotonic_ns() read itself, which makes a small
+    long int on the board. Each dump() prints percentiles for the window
+    since the previous dump and then clears the histograms, so one outlier
+    no longer sets the max forever.
+
+    With track_alloc, gc.mem_alloc() is also sampled inside each start/stop
+    pair (inside the clock reads, so their long ints are not counted) and
+    dump() flags every stage whose heap grew during the window. A collection
+    in the middle of a stage hides that sample, so a stage that allocates
+    will still show up in most windows rather than every sample.
+    """
+
+    def __init__(self, stage_names=STAGE_NAMES, enabled=True, track_alloc=False):
+        self.stage_names = stage_names
+        self.enabled = enabled
+        self.track_alloc = track_alloc
+        stages = len(stage_names)
+        self.histogram = array("L", [0] * (stages * BUCKETS))
+        self.count = array("L", [0] * stages)
+        self.total_us = array("L", [0] * stages)
+        self.max_us = array("L", [0] * stages)
+        self.started = array("q", [0] * stages)                 # monotonic_ns at start()
+        self.alloc_started = array("l", [0] * stages)           # gc.mem_alloc() at start()
+        self.alloc_bytes = array("L", [0] * stages)
+        self.alloc_count = array("L", [0] * stages)             # samples in which the heap grew
+        self.window_start = time.monotonic()
+
+    def start(self, stage):
+        if self.enabled:
+            self.started[stage] = time.monotonic_ns()
+            if self.track_alloc:
+                self.alloc_started[stage] = gc.mem_alloc()
+
+    def stop(self, stage):
+        if self.enabled:
+            if self.track_alloc:
+                grown = gc.mem_alloc() - self.alloc_started[stage]
+                if grown > 0:
+                    self.alloc_bytes[stage] += grown
+                    self.alloc_count[stage] += 1
+            self.record(stage, (time.monotonic_ns() - self.started[stage]) // 1000)
+
+    def record(self, stage, elapsed_us):
+        bucket = 0
+        remaining = elapsed_us
+        while remaining and bucket < BUCKETS - 1:
+            remaining >>= 1
+            bucket += 1
+        self.histogram[stage * BUCKETS + bucket] += 1
+        self.count[stage] += 1
+        self.total_us[stage] += elapsed_us
+        if elapsed_us > self.max_us[stage]:
+            self.max_us[stage] = elapsed_us
+
+    def percentile(self, stage, fraction):
+        """Upper bound in us of the bucket holding the given fraction of this window's samples."""
+        target = self.count[stage] * fraction
+        seen = 0
+        base = stage * BUCKETS
+        for bucket in range(BUCKETS):
+            seen += self.histogram[base + bucket]
+            if seen >= target and seen:
+                return 1 << bucket if bucket else 1
+        return 0
+
+    def reset(self):
+        for i in range(len(self.histogram)):
+            self.histogram[i] = 0
+        for stage in range(len(self.stage_names)):
+            self.count[stage] = 0
+            self.total_us[stage] = 0
+            self.max_us[stage] = 0
+            self.alloc_bytes[stage] = 0
+            self.alloc_count[stage] = 0
+        self.window_start = time.monotonic()
+
+    def dump(self):
+        """Print this window's per-stage summary and start a new window."""
+        window = time.monotonic() - self.window_start
+        print("\n---- PROFILE: last %.1f s (percentiles are bucket upper bounds) ----" % window)
+        for stage, name in enumerate(self.stage_names):
+            count = self.count[stage]
+            if not count:
+                continue
+            print("     - %-9s n=%-6d avg=%6dus p50<=%6dus p90<=%6dus p99<=%6dus max=%6dus" % (
+                name, count, self.total_us[stage] // count,
+                self.percentile(stage, 0.5), self.percentile(stage, 0.9),
+                self.percentile(stage, 0.99), self.max_us[stage]))
+            if self.alloc_count[stage]:
+                print("       ALLOCATES: heap grew in %d of %d samples, %d bytes" % (
+                    self.alloc_count[stage], count, self.alloc_bytes[stage]))
+        self.reset()
@@ -0,0 +1,187 @@
+# sensors.py
+
+import time
+from array import array
+from adafruit_bus_device.i2c_device import I2CDevice
+from filters import ticks_ms
+
+# VL6180X registers (16-bit register addresses)
+_SYSTEM__INTERRUPT_CLEAR = 0x015
+_SYSRANGE__START = 0x018
+_SYSRANGE__INTERMEASUREMENT_PERIOD = 0x01B
+_RESULT__RANGE_STATUS = 0x04D
+_RESULT__INTERRUPT_STATUS_GPIO = 0x04F
+_RESULT__RANGE_VAL = 0x062
+
+_RANGE_NEW_SAMPLE_READY = 0x04                                  # RESULT__INTERRUPT_STATUS_GPIO bits 2:0
+_START_CONTINUOUS = 0x03                                        # SYSRANGE__START: start/stop + continuous mode
+_CLEAR_ALL = 0x07
+_FAULT_STATUS_MAX = 6                                           # range status 1-5: system error, 6: ECE check failed
+
+class RangeSensor:
+    """
+    VL6180X in continuous ranging mode, read without waiting on conversions.
+
+    The adafruit_vl6180x driver still performs the power-on tuning; this class
+    only starts continuous ranging and polls the result registers. poll() costs
+    one 1-byte register read when no result is ready, and each stored reading
+    carries the time it was collected.
+    """
+
+    def __init__(self, i2c, address=0x29, period=0.1):
+        self.device = I2CDevice(i2c, address)
+        self.address = address
+        self.period = period
+        self.running = False
+        self.start_at = None
+        self.value = 0                                          # last range in mm
+        self.timestamp = 0.0                                    # when value was read
+        self.timestamp_ms = 0                                   # the same moment as filters.ticks_ms()
+        self.status = 0                                         # range error code, 0 = valid
+        self.samples = 0
+        self._out = bytearray(3)
+        self._in = bytearray(1)
+
+    def _write(self, register, value):
+        self._out[0] = register >> 8
+        self._out[1] = register & 0xFF
+        self._out[2] = value
+        with self.device as device:
+            device.write(self._out)
+
+    def _read(self, register):
+        self._out[0] = register >> 8
+        self._out[1] = register & 0xFF
+        with self.device as device:
+            device.write_then_readinto(self._out, self._in, out_end=2)
+        return self._in[0]
+
+    @property
+    def fault(self):
+        """True if the last reading reported a sensor fault rather than just no target."""
+        return 1 <= self.status <= _FAULT_STATUS_MAX
+
+    def start(self, now, delay=0.0):
+        """Begin continuous ranging at the first poll() at least delay seconds after now."""
+        self.start_at = now + delay
+
+    def stop(self):
+        if self.running:
+            self._write(_SYSRANGE__START, _START_CONTINUOUS)    # writing start/stop again halts continuous mode
+        self.running = False
+        self.start_at = None
+
+    def poll(self, now):
+        """Store a new reading if one is ready. Returns True when value changed hands."""
+        if not self.running:
+            if self.start_at is None or now < self.start_at:
+                return False
+            # inter-measurement period is in 10 ms units, minus one
+            self._write(_SYSRANGE__INTERMEASUREMENT_PERIOD, max(0, int(self.period * 100) - 1))
+            self._write(_SYSTEM__INTERRUPT_CLEAR, _CLEAR_ALL)
+            self._write(_SYSRANGE__START, _START_CONTINUOUS)
+            self.running = True
+            return False
+
+        if self._read(_RESULT__INTERRUPT_STATUS_GPIO) & 0x07 != _RANGE_NEW_SAMPLE_READY:
+            return False
+
+        self.status = self._read(_RESULT__RANGE_STATUS) >> 4
+        self.value = self._read(_RESULT__RANGE_VAL)
+        self._write(_SYSTEM__INTERRUPT_CLEAR, _CLEAR_ALL)
+        self.timestamp = now
+        self.timestamp_ms = ticks_ms()
+        self.samples += 1
+        return True
+
+class SensorArray:
+    """
+    Any number of RangeSensors sharing one bus, polled round robin under a
+    time budget.
+
+    start() staggers the sensors' continuous ranging evenly across one
+    period, so their results arrive at different times. Each poll() checks
+    sensors in turn, starting after the last one it checked. It always
+    checks at least one sensor and stops once budget seconds of I2C time
+    are used, so bus time per call stays bounded however many sensors
+    there are. The next call carries on from where this one stopped.
+
+    The latest range of sensor k is values[k], and updated[k] is set when
+    the last poll() stored a new reading for it. Per-sensor counters live
+    in preallocated arrays:
+      - last and worst poll latency
+      - I2C errors, counted as the OSError is swallowed
+      - readings that reported a fault
+    As with the profiler, only the monotonic_ns() reads make small long ints.
+    """
+
+    def __init__(self, sensors, budget=0.002, initial=255):
+        self.sensors = sensors
+        self.count = len(sensors)
+        self.budget_ns = int(budget * 1000000000)
+        self.values = array("H", [initial] * self.count)         # latest range per sensor, mm
+        self.updated = bytearray(self.count)                    # new reading in the last poll()
+        self.latency_us = array("L", [0] * self.count)          # duration of the last check
+        self.max_latency_us = array("L", [0] * self.count)
+        self.checks = array("L", [0] * self.count)
+        self.readings = array("L", [0] * self.count)
+        self.errors = array("L", [0] * self.count)              # I2C errors since boot
+        self.faults = array("L", [0] * self.count)              # readings with a fault status since boot
+        self.next = 0                                           # first sensor for the next poll()
+        self.over_budget = 0                                    # polls that stopped before a full round
+
+    def start(self, now):
+        period = self.sensors[0].period if self.count else 0.0
+        for k, sensor in enumerate(self.sensors):
+            sensor.start(now, period * k / self.count)
+
+    def stop(self):
+        for sensor in self.sensors:
+            sensor.stop()
+
+    def poll(self, now):
+        """Check sensors round robin until the budget is spent. Returns the number of new readings."""
+        updated = self.updated
+        for k in range(self.count):
+            updated[k] = 0
+        new = 0
+        began = time.monotonic_ns()
+        for checked in range(self.count):
+            k = self.next
+            self.next = k + 1 if k + 1 < self.count else 0
+            sensor = self.sensors[k]
+            started = time.monotonic_ns()
+            try:
+                ready = sensor.poll(now)
+            except OSError:                                     # sensor unplugged or bus glitch: try again next round
+                self.errors[k] += 1
+                ready = False
+            finished = time.monotonic_ns()
+            elapsed = (finished - started) // 1000
+            self.latency_us[k] = elapsed
+            if elapsed > self.max_latency_us[k]:
+                self.max_latency_us[k] = elapsed
+            self.checks[k] += 1
+            if ready:
+                self.values[k] = sensor.value
+                updated[k] = 1
+                self.readings[k] += 1
+                if sensor.fault:
+                    self.faults[k] += 1
+                new += 1
+            if finished - began >= self.budget_ns and checked < self.count - 1:
+                self.over_budget += 1
+                break
+        return new
+
+    def report(self):
+        """Print per-sensor checks and latency since the last report, then start a new window."""
+        print("\n---- SENSORS: %d polls stopped at the I2C budget ----" % self.over_budget)
+        for k, sensor in enumerate(self.sensors):
+            print("     - 0x%02x checks=%-6d readings=%-5d last=%5dus max=%5dus errors=%d faults=%d" % (
+                sensor.address, self.checks[k], self.readings[k], self.latency_us[k],
+                self.max_latency_us[k], self.errors[k], self.faults[k]))
+            self.checks[k] = 0
+            self.readings[k] = 0
+            self.max_latency_us[k] = 0
+        self.over_budget = 0
@@ -0,0 +1,59 @@
+# sim - host-side hardware simulator for the kiosk
+#
+# install() puts stand-ins for board, busio, digitalio, neopixel,
+# neopixel_write, adafruit_vl6180x, rainbowio, supervisor and ulab ahead of
+# everything on sys.path, then patches time and gc so code.py, effects.py and
+# the other board scripts run unmodified under CPython. Run a script with
+#
+#     python -m sim code.py --seconds 10
+#
+# Frames, wire time, range traces and button scripts live in sim.hardware.
+
+import gc
+import os
+import sys
+import time
+import traceback
+
+from sim import hardware
+from sim.hardware import StopSimulation
+
+STUB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubs")
+
+_installed = False
+
+def _mem_alloc():
+    import tracemalloc
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return 0
+
+def _mem_free():
+    return max(0, hardware.HEAP_BYTES - _mem_alloc())
+
+def _print_exception_and_stop(*args, **kwargs):
+    _print_exception(*args, **kwargs)
+    if kwargs.get("file") is None:                              # printing to a log file is not the end yet
+        raise StopSimulation("program reported a crash")
+
+_print_exception = traceback.print_exception
+
+def install(fast=True, stop_on_crash=True):
+    """
+    Make the stand-ins importable and route time through sim.hardware.clock.
+    With stop_on_crash, traceback.print_exception() ends the run so the
+    kiosk's halt-forever crash handler does not hang the host.
+    """
+    global _installed
+    hardware.clock.fast = fast
+    if _installed:
+        return
+    _installed = True
+    sys.path.insert(0, STUB_PATH)
+    time.monotonic = hardware.clock.monotonic
+    time.monotonic_ns = hardware.clock.monotonic_ns
+    time.sleep = hardware.clock.sleep
+    gc.mem_alloc = _mem_alloc
+    gc.mem_free = _mem_free
+    if stop_on_crash:
+        traceback.print_exception = _print_exception_and_stop
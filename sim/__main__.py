@@ -0,0 +1,85 @@
+# python -m sim [options] script.py
+#
+# Runs a board script (usually code.py) against the stand-ins and prints a
+# per-strip summary of frames shown and modeled wire time.
+
+import argparse
+import os
+import runpy
+import sys
+import tempfile
+
+import sim
+from sim import hardware
+
+def parse_range(text):
+    address, _, path = text.partition("=")
+    return int(address, 0), path
+
+def parse_pin(text):
+    """D0=2:1,2.5:0 -> ("D0", [(2.0, 1), (2.5, 0)])"""
+    name, _, events = text.partition("=")
+    pairs = []
+    for event in events.split(","):
+        when, _, level = event.partition(":")
+        pairs.append((float(when), int(level)))
+    return name, pairs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sim", description=__doc__)
+    parser.add_argument("script", help="board script to run, e.g. code.py")
+    parser.add_argument("--seconds", type=float, default=10.0, help="simulated run time")
+    parser.add_argument("--realtime", action="store_true",
+                        help="really sleep and wait out wire time instead of skipping it")
+    parser.add_argument("--range", action="append", default=[], type=parse_range,
+                        metavar="ADDR=CSV", help="replay a seconds,mm trace on a VL6180X address")
+    parser.add_argument("--pin", action="append", default=[], type=parse_pin,
+                        metavar="PIN=T:V,...", help="script an input pin, e.g. D0=2:1,2.5:0")
+    parser.add_argument("--frames", metavar="CSV", help="write every recorded frame as pin,seconds,hex")
+    parser.add_argument("--fs", metavar="DIR",
+                        help="directory standing in for CIRCUITPY, where the script's files are written "
+                             "(default: a new temporary directory)")
+    parser.add_argument("--telemetry", metavar="FILE",
+                        help="enable usb_cdc.data and capture binary telemetry to FILE")
+    args = parser.parse_args(argv)
+
+    sim.install(fast=not args.realtime)
+    for address, path in args.range:
+        hardware.set_range_trace(address, hardware.load_range_trace(path))
+    for name, events in args.pin:
+        hardware.set_pin_script(name, events)
+    if args.telemetry:
+        import usb_cdc
+        usb_cdc.data = usb_cdc.Serial(args.telemetry)
+    hardware.clock.stop_at = hardware.clock.monotonic() + args.seconds
+
+    script = os.path.abspath(args.script)
+    sys.path.insert(1, os.path.dirname(script))
+    if args.frames:
+        args.frames = os.path.abspath(args.frames)
+    filesystem = os.path.abspath(args.fs) if args.fs else tempfile.mkdtemp(prefix="circuitpy-")
+    os.makedirs(filesystem, exist_ok=True)
+    os.chdir(filesystem)                                        # relative paths on the board are relative to /
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except sim.StopSimulation as stop:
+        print("\n---- SIMULATION STOPPED: %s" % stop)
+
+    for recorder in hardware.strips.values():
+        print("---- STRIP %s: %d shows, %.1f ms wire time (%.2f ms/show)" % (
+            recorder.pin_name, recorder.shows, recorder.wire_seconds * 1000,
+            recorder.wire_seconds * 1000 / max(1, recorder.shows)))
+    if len(hardware.strips) > 1:                                # neopixel_write blocks, so strips never overlap
+        print("---- ALL STRIPS: %.1f ms wire time" % (
+            sum(recorder.wire_seconds for recorder in hardware.strips.values()) * 1000))
+    written = sorted(os.listdir(filesystem))
+    if written:
+        print("---- FILES in %s: %s" % (filesystem, ", ".join(written)))
+    if args.frames:
+        with open(args.frames, "w") as f:
+            for recorder in hardware.strips.values():
+                for when, data in recorder.frames:
+                    f.write("%s,%.6f,%s\n" % (recorder.pin_name, when, data.hex()))
+
+if __name__ == "__main__":
+    main()
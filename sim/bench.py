@@ -0,0 +1,320 @@
+# python -m sim.bench [--frames N] [--sizes 24,250,1000] [--out bench_results.json]
+#
+# Frame-time benchmark for every effect the kiosk ships, run against the
+# host stand-ins. Each effect is split into a render step (the effect math
+# and buffer writes) and a show step. Render time is measured on the host.
+# Show time is the modeled 800 kHz wire time from sim.hardware, because the
+# stand-in's pixel packing runs in Python and its cost says nothing about
+# the board. A second tracemalloc pass records, per frame, the peak bytes
+# allocated above the heap the frame started with, which is the pressure
+# that turns into gc pauses on the board. The *_split effects drive a
+# MultiFrameBuffer over four pins; their show time is the sum over strips.
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+import sim
+from sim import hardware
+
+sim.install(fast=True)
+
+import board                                                    # noqa: E402  (stand-ins)
+import neopixel                                                 # noqa: E402
+from rainbowio import colorwheel                                # noqa: E402
+from ulab import numpy as np                                    # noqa: E402
+
+import effects                                                  # noqa: E402
+import framecache                                               # noqa: E402
+import palettes                                                 # noqa: E402
+import playlist                                                 # noqa: E402
+from colors import FIRESIDE, HARBOR                             # noqa: E402
+from framebuffer import FrameBuffer, MultiFrameBuffer           # noqa: E402
+from utils import (build_hue_table, build_hue_index_table,      # noqa: E402
+                   build_value_table, hue_value_fill)
+
+DEFAULT_SIZES = (24, 250, 1000)
+FRAME_SECONDS = 0.02                                            # simulated time between frames
+SPIRAL_DRIFT = 0.196
+SPARK_COUNT = 8
+SPLIT_PINS = (board.A1, board.A2, board.A3, board.A4)           # strips for the *_split benchmarks
+
+# Each factory returns (render(index, now), show()) for a strip of n pixels.
+# Legacy scripts are reproduced one frame of their loop at a time.
+
+def _strip(n):
+    return neopixel.NeoPixel(board.A1, n, auto_write=False, pixel_order=neopixel.GRB)
+
+def _frame(n):
+    pixels = _strip(n)
+    return pixels, FrameBuffer(n, neopixel.GRB, pixels.pin)
+
+def _split_frame(n):
+    """n pixels over len(SPLIT_PINS) strips, the last one in RGB to exercise the reorder."""
+    strips = []
+    start = 0
+    for k, pin in enumerate(SPLIT_PINS):
+        end = n * (k + 1) // len(SPLIT_PINS)
+        strips.append((pin, end - start, neopixel.RGB if k == len(SPLIT_PINS) - 1 else neopixel.GRB))
+        start = end
+    return MultiFrameBuffer(strips)
+
+def bench_fire_loop(n):
+    """effects.fire(), the per-pixel reference, with the old tolist() copy."""
+    pixels = _strip(n)
+    state = {"np": np.zeros((n, 3), dtype=np.int16)}
+    fade_by = np.array((-3, -3, -3), dtype=np.int16)
+
+    def render(index, now):
+        state["np"] = effects.fire(state["np"], fade_by, n, SPIRAL_DRIFT, SPARK_COUNT)
+        pixels[:] = state["np"].tolist()
+    return render, pixels.show
+
+def bench_fire(n):
+    """effects.Fire into a FrameBuffer."""
+    _, frame = _frame(n)
+    fire_effect = effects.Fire(n, SPIRAL_DRIFT, SPARK_COUNT)
+
+    def render(index, now):
+        fire_effect.step(frame, now)
+    return render, frame.show
+
+def bench_lightning(n):
+    """effects.Lightning, restarted whenever a strike finishes."""
+    _, frame = _frame(n)
+    lightning_effect = effects.Lightning()
+
+    def render(index, now):
+        if not lightning_effect.step(frame, now):
+            lightning_effect.start(now)
+    return render, frame.show
+
+def bench_hue_fill(n):
+    """The interactive path: sensor pair -> table lookup -> solid fill."""
+    _, frame = _frame(n)
+    hue_table = build_hue_table()
+    hue_index_table = build_hue_index_table(1, 180)
+    value_table = build_value_table(1, 180)
+
+    def render(index, now):
+        x = index % 256
+        y = (index * 7) % 256
+        hue_value_fill(frame, hue_table, hue_index_table[y], value_table[x])
+    return render, frame.show
+
+def bench_shooting_star(n):
+    """One frame of shooting_star.py: clear, draw the star and its fading tail."""
+    pixels = _strip(n)
+    color = (255, 255, 0)
+    tail_length = 10
+
+    def render(index, now):
+        i = index % (n + tail_length)
+        pixels.fill((0, 0, 0))
+        if i < n:
+            pixels[i] = color
+        for j in range(1, tail_length + 1):
+            if 0 <= i - j < n:                                  # the script wrote past the strip end
+                fade_factor = (tail_length - j) / tail_length
+                pixels[i - j] = (int(color[0] * fade_factor),
+                                 int(color[1] * fade_factor),
+                                 int(color[2] * fade_factor))
+    return render, pixels.show
+
+def bench_rainbow_cycle(n):
+    """One step j of michael.py rainbow_cycle()."""
+    pixels = _strip(n)
+
+    def render(index, now):
+        j = index % 255
+        for i in range(n):
+            rc_index = (i * 256 // n) + j
+            pixels[i] = colorwheel(rc_index & 255)
+    return render, pixels.show
+
+def bench_color_chase(n):
+    """One step of michael.py color_chase(): set the next pixel, then show."""
+    pixels = _strip(n)
+    colors = ((255, 0, 0), (0, 255, 0), (0, 100, 255))
+
+    def render(index, now):
+        pixels[index % n] = colors[(index // n) % len(colors)]
+    return render, pixels.show
+
+def bench_rainbow_cached(n):
+    """rainbow_cycle() played from a framecache rotation: one window copy per frame."""
+    _, frame = _frame(n)
+    cache = framecache.FrameCache(4 * n * 3)
+
+    def build():
+        return framecache.rotation(effects.rainbow_frame(n, neopixel.GRB), 3)
+
+    def render(index, now):
+        cache.get("rainbow", build).play(frame, index)
+    return render, frame.show
+
+def bench_chase_cached(n):
+    """color_chase() for three colors played from one framecache wipes() store."""
+    _, frame = _frame(n)
+    cache = framecache.FrameCache(8 * n * 3)
+    colors = ((255, 0, 0), (0, 255, 0), (0, 100, 255))
+
+    def render(index, now):
+        cache.get(colors, lambda: framecache.wipes(colors, n, neopixel.GRB)).play(frame, index)
+    return render, frame.show
+
+def bench_crossfade(n):
+    """playlist.Sequencer crossfading between two chase_cached stores the whole run."""
+    _, frame = _frame(n)
+    cache = framecache.FrameCache(16 * n * 3)
+    for name, colors in (("bench_a", ((255, 0, 0), (0, 255, 0))), ("bench_b", ((0, 100, 255), (255, 255, 0)))):
+        playlist.register(name, lambda colors=colors: effects.CachedAnimation(
+            cache, colors, lambda: framecache.wipes(colors, n, neopixel.GRB)))
+    sequencer = playlist.Sequencer(frame, playlist.Playlist((("bench_a", 0.0, 1), ("bench_b", 1.0, 1))),
+                                   crossfade=1e6)              # still fading when the run ends
+    sequencer.start(0.0)
+
+    def render(index, now):
+        sequencer.step(now)
+    return render, frame.show
+
+def bench_palette_wave(n):
+    """effects.PaletteWave, crossfading between two gradients half the time."""
+    _, frame = _frame(n)
+    wave = effects.PaletteWave(n, (FIRESIDE, HARBOR), palettes.PaletteCache(2), hold=0.5, fade=0.5)
+
+    def render(index, now):
+        wave.step(frame, now)
+    return render, frame.show
+
+def bench_chase_split(n):
+    """chase_cached over four strips: each frame changes one pixel, so one strip is sent."""
+    frame = _split_frame(n)
+    cache = framecache.FrameCache(8 * n * 3)
+    colors = ((255, 0, 0), (0, 255, 0), (0, 100, 255))
+
+    def render(index, now):
+        cache.get(colors, lambda: framecache.wipes(colors, n, neopixel.GRB)).play(frame, index)
+    return render, frame.show
+
+def bench_fire_split(n):
+    """effects.Fire over four strips: strips the flames do not reach are skipped."""
+    frame = _split_frame(n)
+    fire_effect = effects.Fire(n, SPIRAL_DRIFT, SPARK_COUNT)
+
+    def render(index, now):
+        fire_effect.step(frame, now)
+    return render, frame.show
+
+def bench_fade_loop(n):
+    """One pass of the fire_with_ulab.py loop: three sparks, fade, clip, copy."""
+    _, frame = _frame(n)
+    state = {"np": np.zeros((n, 3), dtype=np.int16)}
+    fade_by = np.array((-3, -3, -3), dtype=np.int16)
+    c = 0xFF6600
+    spark = (c >> 16 & 0xFF, c >> 8 & 0xFF, c & 0xFF)
+
+    def render(index, now):
+        leds_np = state["np"]
+        for _ in range(3):
+            leds_np[random.randint(0, n - 1)] = spark
+        leds_np += fade_by
+        leds_np = np.clip(leds_np, 0, 255)
+        frame.load(leds_np)
+        state["np"] = leds_np
+    return render, frame.show
+
+BENCHMARKS = {
+    "fire_loop": bench_fire_loop,
+    "fire": bench_fire,
+    "lightning": bench_lightning,
+    "hue_fill": bench_hue_fill,
+    "shooting_star": bench_shooting_star,
+    "rainbow_cycle": bench_rainbow_cycle,
+    "color_chase": bench_color_chase,
+    "rainbow_cached": bench_rainbow_cached,
+    "chase_cached": bench_chase_cached,
+    "crossfade": bench_crossfade,
+    "palette_wave": bench_palette_wave,
+    "chase_split": bench_chase_split,
+    "fire_split": bench_fire_split,
+    "fade_loop": bench_fade_loop,
+}
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def run_one(name, factory, n, frames):
+    hardware.reset()
+    random.seed(3688)
+    render, show = factory(n)
+
+    # Timing pass
+    render_ms = []
+    now = 0.0
+    for index in range(frames):
+        start = time.perf_counter()
+        render(index, now)
+        render_ms.append((time.perf_counter() - start) * 1000)
+        show()
+        now += FRAME_SECONDS
+    recorders = hardware.strips.values()                        # writes block, so strips add up
+    wire_ms = sum(r.wire_seconds for r in recorders) * 1000 / frames   # per frame, so skipped shows count as free
+    shows = sum(r.shows for r in recorders)
+
+    # Allocation pass: peak heap above the frame's starting point
+    render, show = factory(n)
+    alloc_bytes = []
+    tracemalloc.start()
+    for index in range(frames):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        render(index, index * FRAME_SECONDS)
+        alloc_bytes.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    ordered = sorted(render_ms)
+    return {
+        "effect": name,
+        "pixels": n,
+        "frames": frames,
+        "render_ms_mean": sum(render_ms) / frames,
+        "render_ms_p50": _percentile(ordered, 0.5),
+        "render_ms_p95": _percentile(ordered, 0.95),
+        "render_ms_max": ordered[-1],
+        "show_ms_modeled": wire_ms,
+        "shows": shows,
+        "frame_ms_total": sum(render_ms) / frames + wire_ms,
+        "alloc_bytes_mean": sum(alloc_bytes) / frames,
+        "alloc_bytes_max": max(alloc_bytes),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sim.bench", description=__doc__)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--sizes", default=",".join(str(n) for n in DEFAULT_SIZES),
+                        help="comma-separated pixel counts")
+    parser.add_argument("--effects", default=",".join(BENCHMARKS),
+                        help="comma-separated subset of: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--out", default="bench_results.json", help="JSON results file")
+    args = parser.parse_args(argv)
+
+    sizes = [int(n) for n in args.sizes.split(",")]
+    results = []
+    print("%-14s %6s %10s %10s %10s %12s" % ("effect", "pixels", "render ms", "p95 ms", "show ms", "alloc B/frm"))
+    for name in args.effects.split(","):
+        for n in sizes:
+            result = run_one(name, BENCHMARKS[name], n, args.frames)
+            results.append(result)
+            print("%-14s %6d %10.3f %10.3f %10.3f %12.0f" % (
+                name, n, result["render_ms_mean"], result["render_ms_p95"],
+                result["show_ms_modeled"], result["alloc_bytes_mean"]))
+
+    with open(args.out, "w") as f:
+        json.dump({"frame_seconds": FRAME_SECONDS, "results": results}, f, indent=2)
+    print("---- wrote %d results to %s" % (len(results), args.out))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# python -m sim.decode_telemetry [options] capture
+#
+# Decodes telemetry records from telemetry.py into CSV, or plots them as
+# they arrive. The capture is either raw bytes from the usb_cdc data port
+# (a saved file, or the port device itself, e.g. /dev/ttyACM1) or a console
+# log holding the KT: hex lines written when no data port is enabled.
+
+import argparse
+import binascii
+import struct
+import sys
+
+from telemetry import CONSOLE_PREFIX, FIELDS, MAGIC, RECORD_FORMAT, RECORD_SIZE
+
+def _valid(record):
+    return record[:2] == MAGIC and sum(record[:-1]) & 0xFF == record[-1]
+
+def decode_bytes(data, stats=None):
+    """Return (records, consumed) for a byte string, resyncing on the magic after damage."""
+    records = []
+    i = 0
+    while i + RECORD_SIZE <= len(data):
+        record = data[i:i + RECORD_SIZE]
+        if _valid(record):
+            records.append(struct.unpack(RECORD_FORMAT, record)[1:-1])
+            i += RECORD_SIZE
+            continue
+        if stats is not None:
+            stats["bad"] += 1
+        found = data.find(MAGIC, i + 1)
+        if found < 0:
+            i = max(i + 1, len(data) - 1)                       # keep a trailing "K" for the next chunk
+            break
+        i = found
+    return records, i
+
+def decode_stream(stream, stats=None):
+    """Yield records from a binary stream as they arrive."""
+    pending = b""
+    while True:
+        chunk = stream.read(4096)
+        if not chunk:
+            break
+        records, used = decode_bytes(pending + chunk, stats)
+        pending = (pending + chunk)[used:]
+        yield from records
+
+def decode_console(lines, stats=None):
+    for line in lines:
+        start = line.find(CONSOLE_PREFIX)
+        if start < 0:
+            continue
+        try:
+            data = binascii.unhexlify(line[start + len(CONSOLE_PREFIX):].strip())
+        except (binascii.Error, ValueError):
+            if stats is not None:
+                stats["bad"] += 1
+            continue
+        yield from decode_bytes(data, stats)[0]
+
+def _is_console_log(head):
+    if CONSOLE_PREFIX.encode() in head:
+        return True
+    return bool(head) and not head.startswith(MAGIC) and all(b in b"\r\n\t" or 32 <= b < 127 for b in head)
+
+def open_records(path, stats=None):
+    with open(path, "rb") as f:
+        head = f.peek(256)[:256]
+        if not _is_console_log(head):
+            yield from decode_stream(f, stats)
+            return
+    with open(path, "r", errors="replace") as f:
+        yield from decode_console(f, stats)
+
+def write_csv(records, out):
+    out.write("seconds," + ",".join(FIELDS[1:]) + "\n")
+    for record in records:
+        out.write("%.3f,%s\n" % (record[1] / 1000, ",".join(str(v) for v in record[1:])))
+        out.flush()
+
+def plot(records, window):
+    import matplotlib.pyplot as plt                             # only needed for --plot
+
+    index = {name: i for i, name in enumerate(FIELDS)}
+    series = ("x", "y", "render_avg", "show_avg")
+    plt.ion()
+    figure, (ranges, timing) = plt.subplots(2, 1, sharex=True)
+    times = []
+    values = {name: [] for name in series}
+    for count, record in enumerate(records):
+        times.append(record[index["ms"]] / 1000)
+        for name in series:
+            values[name].append(record[index[name]])
+        if count % 10:
+            continue
+        for axis, names, label in ((ranges, ("x", "y"), "mm"), (timing, ("render_avg", "show_avg"), "us")):
+            axis.clear()
+            for name in names:
+                axis.plot(times[-window:], values[name][-window:], label=name)
+            axis.set_ylabel(label)
+            axis.legend(loc="upper left")
+        timing.set_xlabel("seconds")
+        plt.pause(0.01)
+    plt.ioff()
+    plt.show()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sim.decode_telemetry", description=__doc__)
+    parser.add_argument("capture", help="raw data-port capture, port device, or console log")
+    parser.add_argument("--csv", metavar="FILE", help="write CSV here instead of stdout")
+    parser.add_argument("--plot", action="store_true", help="plot ranges and stage times as records arrive")
+    parser.add_argument("--window", type=int, default=600, help="records shown by --plot")
+    args = parser.parse_args(argv)
+
+    stats = {"bad": 0}
+    records = open_records(args.capture, stats)
+    if args.plot:
+        plot(records, args.window)
+    elif args.csv:
+        with open(args.csv, "w") as out:
+            write_csv(records, out)
+    else:
+        write_csv(records, sys.stdout)
+    if stats["bad"]:
+        print("---- skipped %d damaged records" % stats["bad"], file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# hardware.py
+#
+# Shared state behind the stand-in modules in sim/stubs: the simulated
+# clock, recorded strip frames, replayed range traces and scripted pins.
+
+import collections
+import time
+
+_real_monotonic = time.monotonic
+_real_sleep = time.sleep
+
+WIRE_SECONDS_PER_BYTE = 8 / 800000          # WS2812 data rate, 30 us per RGB pixel
+RESET_SECONDS = 0.00005                     # latch time after each frame
+HEAP_BYTES = 100000                         # roughly what a Metro M7 reports free at boot
+MAX_RECORDED_FRAMES = 10000
+
+class StopSimulation(BaseException):
+    """
+    Raised from sleep() and show() once the run time is up. It derives from
+    BaseException so the kiosk's own `except Exception` crash handler lets
+    it through.
+    """
+
+class Clock:
+    """
+    Monotonic clock for the simulation. In fast mode sleep() and modeled
+    wire time advance a virtual offset instead of blocking, so only real
+    compute time is spent waiting.
+    """
+
+    def __init__(self):
+        self.fast = True
+        self.offset = 0.0
+        self.start = _real_monotonic()
+        self.stop_at = None
+
+    def monotonic(self):
+        return _real_monotonic() - self.start + self.offset
+
+    def monotonic_ns(self):
+        return int(self.monotonic() * 1000000000)
+
+    def advance(self, seconds):
+        if seconds <= 0:
+            return
+        if self.fast:
+            self.offset += seconds
+        else:
+            _real_sleep(seconds)
+
+    def sleep(self, seconds):
+        self.check()
+        self.advance(seconds)
+
+    def check(self):
+        if self.stop_at is not None and self.monotonic() >= self.stop_at:
+            raise StopSimulation("simulated run time reached")
+
+clock = Clock()
+
+class StripRecorder:
+    """Frames written to one data pin, with the modeled wire time of each."""
+
+    def __init__(self, pin_name):
+        self.pin_name = pin_name
+        self.frames = collections.deque(maxlen=MAX_RECORDED_FRAMES)   # (timestamp, bytes)
+        self.shows = 0
+        self.bytes_sent = 0
+        self.wire_seconds = 0.0
+
+    def write(self, buf):
+        clock.check()
+        data = bytes(buf)
+        wire = len(data) * WIRE_SECONDS_PER_BYTE + RESET_SECONDS
+        self.frames.append((clock.monotonic(), data))
+        self.shows += 1
+        self.bytes_sent += len(data)
+        self.wire_seconds += wire
+        clock.advance(wire)
+
+strips = {}
+
+def strip(pin_name):
+    if pin_name not in strips:
+        strips[pin_name] = StripRecorder(pin_name)
+    return strips[pin_name]
+
+class RangeTrace:
+    """Replays (seconds, mm) samples; holds each value until the next sample."""
+
+    def __init__(self, samples, loop=True):
+        self.samples = sorted(samples)
+        self.loop = loop
+
+    def value_at(self, t):
+        if not self.samples:
+            return 255
+        if self.loop and len(self.samples) > 1:
+            period = self.samples[-1][0]
+            if period > 0:
+                t = t % period
+        value = self.samples[0][1]
+        for when, mm in self.samples:
+            if when > t:
+                break
+            value = mm
+        return value
+
+range_traces = {}
+
+def set_range_trace(address, samples, loop=True):
+    range_traces[address] = RangeTrace(samples, loop)
+
+def load_range_trace(path):
+    """Read a CSV of `seconds,mm` lines (header and # comments allowed)."""
+    samples = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split(",")
+            try:
+                samples.append((float(fields[0]), int(float(fields[1]))))
+            except ValueError:
+                continue                                        # header row
+    return samples
+
+def range_at(address):
+    trace = range_traces.get(address)
+    if trace is None:
+        return 255                                              # nothing in front of the sensor
+    return trace.value_at(clock.monotonic())
+
+pin_scripts = {}
+
+def set_pin_script(pin_name, events):
+    """events: (seconds, value) pairs; the pin reads the latest value at or before now."""
+    pin_scripts[pin_name] = sorted(events)
+
+def pin_value(pin_name, default=False):
+    events = pin_scripts.get(pin_name)
+    if not events:
+        return default
+    now = clock.monotonic()
+    value = default
+    for when, level in events:
+        if when > now:
+            break
+        value = bool(level)
+    return value
+
+i2c_devices = {}
+
+def reset():
+    clock.__init__()
+    strips.clear()
+    range_traces.clear()
+    pin_scripts.clear()
+    i2c_devices.clear()
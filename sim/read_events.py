@@ -0,0 +1,59 @@
+# python -m sim.read_events events.log.2 events.log.1 events.log
+#
+# Prints the records in event log files written by eventlog.py, oldest file
+# first, one event per line. Damaged records are skipped and counted.
+
+import argparse
+import struct
+import sys
+
+from eventlog import EVENT_NAMES, MAGIC, RECORD_FORMAT, RECORD_SIZE, SENSOR_FAULT
+
+def read_events(data, stats=None):
+    """Yield (seq, seconds, name, a, b) from the bytes of one log file."""
+    i = 0
+    while i + RECORD_SIZE <= len(data):
+        record = data[i:i + RECORD_SIZE]
+        if record[:2] == MAGIC and sum(record[:-1]) & 0xFF == record[-1]:
+            _, seq, ms, event, a, b, _ = struct.unpack(RECORD_FORMAT, record)
+            yield seq, ms / 1000, EVENT_NAMES.get(event, "event_%d" % event), a, b
+            i += RECORD_SIZE
+            continue
+        if stats is not None:
+            stats["bad"] += 1
+        found = data.find(MAGIC, i + 1)
+        if found < 0:
+            return
+        i = found
+
+def describe(name, a, b):
+    if name == EVENT_NAMES[SENSOR_FAULT]:
+        return "sensor 0x%02x status %d" % (a, b) if b else "sensor 0x%02x recovered" % a
+    if name == "long_frame":
+        return "%.1f ms late" % (b / 1000)
+    if name == "boot":
+        return "%d bytes free" % b
+    return ""
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sim.read_events", description=__doc__)
+    parser.add_argument("files", nargs="+", help="log files, oldest first")
+    parser.add_argument("--csv", action="store_true", help="print seq,seconds,event,a,b instead")
+    args = parser.parse_args(argv)
+
+    stats = {"bad": 0}
+    if args.csv:
+        print("seq,seconds,event,a,b")
+    for path in args.files:
+        with open(path, "rb") as f:
+            data = f.read()
+        for seq, seconds, name, a, b in read_events(data, stats):
+            if args.csv:
+                print("%d,%.3f,%s,%d,%d" % (seq, seconds, name, a, b))
+            else:
+                print("%5d %10.3f s  %-13s %s" % (seq, seconds, name, describe(name, a, b)))
+    if stats["bad"]:
+        print("---- skipped %d damaged records" % stats["bad"], file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# adafruit_bus_device - simulator stand-in for the CircuitPython core module
@@ -0,0 +1,45 @@
+# adafruit_vl6180x.py - simulator stand-in
+#
+# Talks to a sim.vl6180x.FakeVL6180X over the simulated bus, so range is a
+# real blocking single shot. Constructing a sensor wires a fake device to
+# its address, standing in for the physical sensor.
+
+from adafruit_bus_device.i2c_device import I2CDevice
+
+from sim import hardware
+from sim import vl6180x
+
+_POLL_SECONDS = 0.001
+
+class VL6180X:
+    def __init__(self, i2c, address=0x29, offset=0):
+        vl6180x.attach(address)
+        self._device = I2CDevice(i2c, address)
+        self.offset = offset
+        if self._read_8(vl6180x.IDENTIFICATION__MODEL_ID) != vl6180x.MODEL_ID:
+            raise RuntimeError("Could not find VL6180X, is it connected and powered?")
+        self._write_8(vl6180x.SYSTEM__FRESH_OUT_OF_RESET, 0x00)
+
+    def _write_8(self, register, value):
+        with self._device as device:
+            device.write(bytes((register >> 8, register & 0xFF, value)))
+
+    def _read_8(self, register):
+        result = bytearray(1)
+        with self._device as device:
+            device.write_then_readinto(bytes((register >> 8, register & 0xFF)), result)
+        return result[0]
+
+    @property
+    def range(self):
+        """Blocking single-shot measurement, like the real driver."""
+        self._write_8(vl6180x.SYSRANGE__START, 0x01)
+        while not self._read_8(vl6180x.RESULT__INTERRUPT_STATUS_GPIO) & 0x04:
+            hardware.clock.sleep(_POLL_SECONDS)
+        value = self._read_8(vl6180x.RESULT__RANGE_VAL)
+        self._write_8(vl6180x.SYSTEM__INTERRUPT_CLEAR, 0x07)
+        return max(0, min(255, value + self.offset))
+
+    @property
+    def range_status(self):
+        return self._read_8(vl6180x.RESULT__RANGE_STATUS) >> 4
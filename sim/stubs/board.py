@@ -0,0 +1,20 @@
+# board.py - simulator stand-in for the Metro M7 pin names
+
+import busio
+
+class Pin:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "board." + self.name
+
+for _name in ("A0", "A1", "A2", "A3", "A4", "A5",
+              "D0", "D1", "D2", "D3", "D4", "D5", "D6", "D7",
+              "D8", "D9", "D10", "D11", "D12", "D13",
+              "SCL", "SDA", "TX", "RX", "MOSI", "MISO", "SCK", "LED", "NEOPIXEL"):
+    globals()[_name] = Pin(_name)
+del _name
+
+def I2C():
+    return busio.I2C(SCL, SDA)
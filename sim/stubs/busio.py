@@ -0,0 +1,55 @@
+# busio.py - simulator stand-in; I2C transfers go to the devices in sim.hardware.i2c_devices
+
+import errno
+
+from sim import hardware
+
+class I2C:
+    def __init__(self, scl, sda, *, frequency=100000, timeout=255):
+        self.scl = scl
+        self.sda = sda
+        self.frequency = frequency
+        self._locked = False
+
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        self._locked = False
+
+    def scan(self):
+        return sorted(hardware.i2c_devices)
+
+    def _device(self, address, byte_count):
+        # 9 clocks per byte plus the address byte
+        hardware.clock.advance((byte_count + 1) * 9 / self.frequency)
+        device = hardware.i2c_devices.get(address)
+        if device is None:
+            raise OSError(errno.ENODEV, "No I2C device at address: 0x%x" % address)
+        return device
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        data = bytes(buffer[start:end])
+        self._device(address, len(data)).write(data)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        end = len(buffer) if end is None else end
+        data = self._device(address, end - start).read(end - start)
+        buffer[start:end] = data
+
+    def writeto_then_readfrom(self, address, out_buffer, in_buffer, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None):
+        self.writeto(address, out_buffer, start=out_start, end=out_end)
+        self.readfrom_into(address, in_buffer, start=in_start, end=in_end)
+
+    def deinit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
@@ -0,0 +1,66 @@
+# neopixel.py - simulator stand-in with the adafruit_pixelbuf behaviour the kiosk uses
+
+import digitalio
+from neopixel_write import neopixel_write
+
+RGB = "RGB"
+GRB = "GRB"
+RGBW = "RGBW"
+GRBW = "GRBW"
+
+class NeoPixel:
+    def __init__(self, pin, n, *, bpp=3, brightness=1.0, auto_write=True, pixel_order=None):
+        if pixel_order is None:
+            pixel_order = GRB if bpp == 3 else GRBW
+        self.pin = digitalio.DigitalInOut(pin)
+        self.pin.direction = digitalio.Direction.OUTPUT
+        self.n = n
+        self.bpp = len(pixel_order)
+        self.byteorder = pixel_order
+        self.brightness = brightness
+        self.auto_write = auto_write
+        self._order = tuple(pixel_order.index(c) for c in "RGBW"[:self.bpp])
+        self._pixels = [(0,) * self.bpp for _ in range(n)]
+
+    def __len__(self):
+        return self.n
+
+    def _to_tuple(self, color):
+        if isinstance(color, int):
+            color = ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+        color = tuple(int(c) for c in color)
+        if len(color) < self.bpp:
+            color = color + (0,) * (self.bpp - len(color))
+        return color
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            indices = range(*index.indices(self.n))
+            for i, color in zip(indices, value):
+                self._pixels[i] = self._to_tuple(color)
+        else:
+            self._pixels[index] = self._to_tuple(value)
+        if self.auto_write:
+            self.show()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._pixels[index]
+        return self._pixels[index]
+
+    def fill(self, color):
+        color = self._to_tuple(color)
+        self._pixels = [color] * self.n
+        if self.auto_write:
+            self.show()
+
+    def show(self):
+        buf = bytearray(self.n * self.bpp)
+        for i, color in enumerate(self._pixels):
+            offset = i * self.bpp
+            for c, position in enumerate(self._order):
+                buf[offset + position] = int(color[c] * self.brightness)
+        neopixel_write(self.pin, buf)
+
+    def deinit(self):
+        self.pin.deinit()
@@ -0,0 +1,6 @@
+# neopixel_write.py - simulator stand-in; records frames and models wire time
+
+from sim import hardware
+
+def neopixel_write(digitalinout, buf):
+    hardware.strip(digitalinout.pin.name).write(buf)
@@ -0,0 +1,11 @@
+# rainbowio.py - simulator stand-in matching the CircuitPython core colorwheel()
+
+def colorwheel(pos):
+    pos = int(pos) % 256
+    if pos < 85:
+        return (255 - pos * 3) << 16 | (pos * 3) << 8
+    if pos < 170:
+        pos -= 85
+        return (255 - pos * 3) << 8 | pos * 3
+    pos -= 170
+    return (pos * 3) << 16 | (255 - pos * 3)
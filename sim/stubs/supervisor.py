@@ -0,0 +1,9 @@
+# supervisor.py - simulator stand-in; ticks_ms() runs on the simulated clock
+
+from sim import hardware
+
+_TICKS_MASK = (1 << 29) - 1
+_TICKS_START = (1 << 29) - 65000                                # like the core: the first wrap comes about a minute in
+
+def ticks_ms():
+    return (int(hardware.clock.monotonic() * 1000) + _TICKS_START) & _TICKS_MASK
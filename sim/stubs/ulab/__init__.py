@@ -0,0 +1 @@
+# ulab - simulator stand-in; ulab.numpy is backed by NumPy
@@ -0,0 +1,10 @@
+# ulab.numpy - simulator stand-in backed by NumPy
+#
+# ulab's float dtype is single precision on the Metro M7, so np.float maps
+# to float32 here. Behaviour outside the subset the kiosk uses is NumPy's,
+# not ulab's.
+
+import numpy as _numpy
+from numpy import *                                             # noqa: F401,F403
+
+float = _numpy.float32
@@ -0,0 +1,23 @@
+# usb_cdc.py - simulator stand-in; the data port is off unless python -m sim --telemetry sets one
+
+class Serial:
+    """Data port that appends everything written to a capture file."""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.connected = True
+        self.write_timeout = None
+        self.bytes_written = 0
+
+    def write(self, buf):
+        data = bytes(buf)
+        self.file.write(data)
+        self.file.flush()
+        self.bytes_written += len(data)
+        return len(data)
+
+console = None
+data = None
+
+def enable(console=True, data=False):
+    pass
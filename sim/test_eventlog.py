@@ -0,0 +1,84 @@
+# python -m pytest sim/test_eventlog.py
+#
+# Checks eventlog.EventLog's RAM ring, batched flushing and rotation, and
+# reads the files back with sim/read_events.py.
+
+import errno
+
+import eventlog
+from eventlog import RECORD_SIZE, EventLog
+from sim import read_events
+
+def _log(tmp_path, **kwargs):
+    return EventLog(str(tmp_path / "events.log"), **kwargs)
+
+def _events(path):
+    with open(path, "rb") as f:
+        return list(read_events.read_events(f.read()))
+
+def test_ring_overflow_keeps_the_newest_records(tmp_path):
+    log = _log(tmp_path, capacity=4, batch=1, min_interval=0.0)
+    for i in range(6):
+        log.log(i, eventlog.LONG_FRAME, 0, i)
+    assert log.pending == 4 and log.lost == 2
+    assert log.flush(6.0)
+    assert [event[4] for event in _events(log.path)] == [2, 3, 4, 5]   # oldest two were overwritten, order kept
+    assert [event[0] for event in _events(log.path)] == [2, 3, 4, 5]
+
+def test_flush_waits_for_a_batch_and_the_interval(tmp_path):
+    log = _log(tmp_path, batch=3, min_interval=60.0)
+    log.log(0.0, eventlog.BOOT)
+    log.log(0.1, eventlog.ATTRACT_START)
+    assert not log.flush(1.0)                                   # batch not full yet
+    log.log(0.2, eventlog.ATTRACT_STOP)
+    assert log.flush(1.0)
+    assert log.pending == 0 and log.written == 3
+    for i in range(3):
+        log.log(2.0 + i, eventlog.LONG_FRAME)
+    assert not log.flush(30.0)                                  # full batch, but inside min_interval
+    assert log.flush(61.0)
+    log.log(62.0, eventlog.CRASH)
+    assert log.flush(62.0, force=True)                          # a crash writes whatever is pending
+    assert log.written == 7 and len(_events(log.path)) == 7
+
+def test_rotates_at_the_size_cap(tmp_path):
+    log = _log(tmp_path, batch=2, min_interval=0.0, max_bytes=4 * RECORD_SIZE, keep=3)
+    for i in range(14):                                         # seven flushes of two records
+        log.log(i, eventlog.LONG_FRAME, 0, i)
+        log.flush(i)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["events.log", "events.log.1", "events.log.2"]
+    assert [event[4] for event in _events(log.path + ".2")] == [4, 5, 6, 7]   # 0-3 rotated out of keep
+    assert [event[4] for event in _events(log.path + ".1")] == [8, 9, 10, 11]
+    assert [event[4] for event in _events(log.path)] == [12, 13]
+
+def test_read_only_filesystem_keeps_records_in_ram(tmp_path, monkeypatch):
+    def read_only(*args):
+        raise OSError(errno.EROFS, "Read-only filesystem")
+    monkeypatch.setattr(eventlog, "open", read_only, raising=False)
+    log = _log(tmp_path, batch=1, min_interval=0.0)
+    log.log(0.0, eventlog.BOOT)
+    assert not log.flush(0.0)
+    assert not log.writable and log.write_errors == 1 and log.pending == 1
+    log.log(1.0, eventlog.ATTRACT_START)
+    assert not log.flush(1.0, force=True)                       # no more attempts once read-only
+    assert log.write_errors == 1 and log.pending == 2
+    assert not (tmp_path / "events.log").exists()
+
+def test_read_events_round_trip(tmp_path, capsys):
+    log = _log(tmp_path, batch=1, min_interval=0.0)
+    log.log(1.5, eventlog.BOOT, 0, 12345)
+    log.log(2.25, eventlog.SENSOR_FAULT, 0x29, 5)
+    log.log(3.0, eventlog.SENSOR_FAULT, 0x29, 0)
+    log.log(4.0, eventlog.LONG_FRAME, 0, 2500)
+    log.flush(4.0)
+    assert _events(log.path) == [(0, 1.5, "boot", 0, 12345), (1, 2.25, "sensor_fault", 0x29, 5),
+                                 (2, 3.0, "sensor_fault", 0x29, 0), (3, 4.0, "long_frame", 0, 2500)]
+
+    with open(log.path, "r+b") as f:                            # damage the second record's checksum
+        f.seek(2 * RECORD_SIZE - 1)
+        f.write(b"\x00")
+    read_events.main([log.path, "--csv"])
+    out, err = capsys.readouterr()
+    assert out.splitlines() == ["seq,seconds,event,a,b", "0,1.500,boot,0,12345",
+                                "2,3.000,sensor_fault,41,0", "3,4.000,long_frame,0,2500"]
+    assert "skipped 1 damaged records" in err
@@ -0,0 +1,99 @@
+# python -m pytest sim/test_filters.py
+#
+# Checks the integer sample filters and presence detection in filters.py,
+# including the wrapping millisecond timestamps SampleHistory runs on.
+
+import sim
+
+sim.install(fast=True)
+
+from sim import hardware                                        # noqa: E402
+
+import supervisor                                               # noqa: E402  (stand-in)
+
+from filters import (TICKS_PERIOD, EmaFilter, MedianFilter,  # noqa: E402
+                     PresenceDetector, RangeFilter, SampleHistory, ticks_diff, ticks_ms)
+
+def _history(start):
+    history = SampleHistory(4, delay=0.05, horizon=0.05)
+    history.add(start, 100)
+    history.add((start + 100) % TICKS_PERIOD, 120)
+    return history
+
+def test_median_drops_a_spike():
+    median = MedianFilter(3, 50)
+    assert [median.update(v) for v in (50, 200, 52)] == [50, 50, 52]
+
+def test_median_of_five_drops_two_spikes():
+    median = MedianFilter(5, 80)
+    assert [median.update(v) for v in (80, 0, 255, 81, 82)] == [80, 80, 80, 80, 81]
+
+def test_ema_converges_in_fixed_point():
+    ema = EmaFilter(2, 0)
+    outputs = [ema.update(100) for _ in range(40)]
+    assert outputs[0] == 25                                     # a quarter of the step per sample
+    assert outputs == sorted(outputs)
+    assert outputs[-1] == 100 and ema.acc >> 8 == 99            # 8.8 accumulator still creeping up
+    ema = EmaFilter(1, 100)
+    assert [ema.update(101) for _ in range(3)] == [101, 101, 101]   # a 1 mm step is not rounded away
+    assert ema.acc == 25824 and ema.update(100) == 100         # 100.875 halves back to 100.44
+
+def test_range_filter_rejects_a_spike_before_smoothing():
+    range_filter = RangeFilter(3, 1, 120)
+    assert [range_filter.update(v) for v in (120, 20, 120, 120)] == [120, 120, 120, 120]
+
+def test_presence_hysteresis():
+    presence = PresenceDetector(150, 170)
+    assert [presence.update(mm) for mm in (200, 160, 149, 160, 170, 171, 160)] == [
+        False, False, True, True, True, False, False]
+
+def test_presence_hold_counts():
+    presence = PresenceDetector(150, 170, enter_samples=2, exit_samples=3)
+    assert [presence.update(mm) for mm in (100, 200, 100, 100)] == [False, False, False, True]
+    assert [presence.update(mm) for mm in (200, 200, 100, 200, 200, 200)] == [
+        True, True, True, True, True, False]                    # the 100 restarts the exit count
+
+def test_ticks_diff_across_the_wrap():
+    assert ticks_diff(5, TICKS_PERIOD - 5) == 10
+    assert ticks_diff(TICKS_PERIOD - 5, 5) == -10
+
+def test_ticks_ms_is_the_supervisor_clock():
+    hardware.reset()
+    assert ticks_ms is supervisor.ticks_ms
+    before = ticks_ms()
+    hardware.clock.advance(0.25)
+    assert 250 <= ticks_diff(ticks_ms(), before) < 260
+    assert 0 <= ticks_ms() < TICKS_PERIOD
+
+def test_ticks_diff_holds_across_the_first_wrap():
+    hardware.reset()
+    before = ticks_ms()
+    hardware.clock.advance(120.0)                               # the simulated clock wraps about a minute in
+    after = ticks_ms()
+    assert after < before
+    assert 120000 <= ticks_diff(after, before) < 120010
+
+def test_interpolates_behind_the_newest_sample():
+    history = _history(1000)
+    assert history.at(1100) == 110                              # 50 ms back: halfway between the samples
+    assert history.at(1125) == 115
+
+def test_extrapolates_then_holds():
+    history = _history(1000)
+    assert history.at(1170) == 124                              # 20 ms past the newest, 0.2 mm/ms
+    assert history.at(1400) == 130                              # capped at the 50 ms horizon
+
+def test_older_than_the_history_holds_the_oldest():
+    assert _history(1000).at(900) == 100
+
+def test_same_results_across_the_wrap():
+    start = TICKS_PERIOD - 40
+    history = _history(start)
+    assert history.at((start + 100) % TICKS_PERIOD) == 110
+    assert history.at((start + 170) % TICKS_PERIOD) == 124
+
+def test_repeated_timestamp_replaces_the_newest():
+    history = _history(1000)
+    history.add(1100, 140)
+    assert history.count == 2
+    assert history.at(1150) == 140
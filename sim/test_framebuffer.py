@@ -0,0 +1,231 @@
+# python -m pytest sim/test_framebuffer.py
+#
+# Checks what framebuffer.FrameBuffer sends to the simulated strip: the
+# dithered output of deep frames, which frames are skipped, and how a
+# MultiFrameBuffer splits a frame over several strips.
+
+import sim
+
+sim.install(fast=True)
+
+from sim import hardware                                        # noqa: E402
+
+import board                                                    # noqa: E402
+import digitalio                                                # noqa: E402
+
+import framebuffer                                              # noqa: E402
+from framebuffer import (DEEP_STEPS, DITHER_FRAMES, FrameBuffer, MultiFrameBuffer,  # noqa: E402
+                         OutputStage)
+from power import PowerLimiter                                  # noqa: E402
+
+def _pin(name="D5"):
+    pin = digitalio.DigitalInOut(getattr(board, name))
+    pin.switch_to_output()
+    return pin
+
+def _deep_frame(gamma=2.2, count=4, **kwargs):
+    hardware.reset()
+    return FrameBuffer(count, "GRB", _pin(), output=OutputStage(gamma), deep=True, **kwargs)
+
+def _frame(**kwargs):
+    hardware.reset()
+    return FrameBuffer(4, "GRB", _pin(), **kwargs)
+
+def _sent():
+    return hardware.strip("D5").shows
+
+def test_repeated_solid_is_skipped():
+    frame = _frame()
+    frame.fill((10, 20, 30))
+    assert frame.show(0.0)
+    frame.fill((10, 20, 30))
+    assert not frame.show(0.02)
+    frame.fill((10, 20, 31))
+    assert frame.show(0.04)
+    assert _sent() == 2
+    assert frame.frames_sent == 2 and frame.frames_skipped == 1
+
+def test_pixel_write_after_a_fill_is_sent():
+    frame = _frame()
+    frame.fill((10, 20, 30))
+    frame.show(0.0)
+    frame.set_pixel(2, (10, 20, 30))                            # same bytes: compared in full, and skipped
+    assert not frame.show(0.02)
+    frame.set_pixel(2, (1, 2, 3))
+    assert frame.show(0.04)
+    frame.fill((10, 20, 30))                                    # back to the solid last sent as bytes, not by color
+    assert frame.show(0.06)
+    assert hardware.strip("D5").frames[-1][1] == bytes([20, 10, 30]) * 4
+
+def test_direct_writes_need_mark_dirty():
+    frame = _frame()
+    frame.fill((10, 20, 30))
+    frame.show(0.0)
+    frame.wire[1, 0] = 99
+    assert not frame.show(0.02)                                 # the stale fill color is trusted
+    frame.mark_dirty()
+    assert frame.show(0.04)
+
+def test_min_refresh_resends_an_unchanged_frame():
+    frame = _frame(min_refresh=1.0)
+    frame.fill((10, 20, 30))
+    assert frame.show(0.0)
+    assert not frame.show(0.5)
+    assert frame.show(1.0)
+    assert not frame.show(1.5)
+    assert frame.frames_sent == 2 and frame.frames_skipped == 2
+
+def test_new_output_table_resends_the_frame():
+    output = OutputStage(1.0)
+    frame = _frame(output=output)
+    frame.fill((200, 100, 50))
+    assert frame.show(0.0)
+    output.set_brightness(1.0)                                  # unchanged: no rebuild
+    assert not frame.show(0.02)
+    output.set_brightness(0.5)
+    assert frame.show(0.04)
+    assert hardware.strip("D5").frames[-1][1][:3] == bytes([50, 100, 25])
+    assert not frame.show(0.06)
+    assert frame.frames_sent == 2 and frame.frames_skipped == 2
+
+def test_new_limit_rescales_the_table_without_recomputing_the_curve(monkeypatch):
+    output = OutputStage(2.2, 0.5)
+    output.enable_deep()
+    version = output.version
+    monkeypatch.setattr(framebuffer, "build_output_curve", None)   # a limit change must not need it
+    output.set_limit(0.25)
+    assert output.version == version + 1
+    assert list(output.table) == [int((i / 255) ** 2.2 * 0.5 * 0.25 * 255 + 0.5) for i in range(256)]
+    assert int(output.table16[-1]) == int(0.5 * 0.25 * 65280 + 0.5)
+
+def test_table16_exists_only_for_deep_frames():
+    output = OutputStage(2.2)
+    _frame(output=output)
+    assert output.table16 is None
+    version = output.version
+    frame = FrameBuffer(4, "GRB", output=output, deep=True)
+    assert frame.output.table16 is not None and len(output.table16) == 256 * DEEP_STEPS
+    assert output.version == version                            # 8-bit frames on the stage need no resend
+    assert int(output.table16[255 * DEEP_STEPS]) == 65280
+    output.set_brightness(0.5)
+    assert int(output.table16[255 * DEEP_STEPS]) == 32640
+
+def _table16_level(output, value):
+    """The table16 entry a deep value is looked up at, as a fraction of one output step."""
+    return output.table16[(value >> 8) * 16 + (value & 0xFF) * 16 // 256] / 256
+
+def test_dither_cycle_averages_to_the_table16_level():
+    for gamma, value in ((1.0, 0x0040), (1.0, 0x00C0), (2.2, 0x2880), (2.2, 0x3A40)):
+        frame = _deep_frame(gamma)
+        frame.fill_rgb16(value, value, value)
+        totals = [0] * len(frame.out)
+        for k in range(DITHER_FRAMES):
+            assert frame.show(k * 0.02)
+            for i, byte in enumerate(frame.out):
+                totals[i] += byte
+        level = _table16_level(frame.output, value)
+        for total in totals:                                    # every byte, whatever its threshold order
+            assert abs(total / DITHER_FRAMES - level) <= 1 / (2 * DITHER_FRAMES)
+
+def test_sub_step_values_are_not_all_black():
+    frame = _deep_frame(1.0)
+    frame.fill_rgb16(0x0040, 0, 0)                              # a quarter of one 8-bit step
+    lit = 0
+    for k in range(DITHER_FRAMES):
+        frame.show(k * 0.02)
+        lit += frame.out[frame.red]
+    assert lit == DITHER_FRAMES // 4
+
+def test_top_entry_plus_largest_threshold_does_not_wrap():
+    frame = _deep_frame(2.2)
+    largest = max(int(t) for thresholds in frame._thresholds for t in thresholds)
+    assert max(int(v) for v in frame.output.table16) + largest <= 0xFFFF
+    frame.fill_rgb16(0xFFFF, 0xFF00, 0xFFFF)                    # 255.996 and 255.0: both full on
+    for k in range(DITHER_FRAMES):
+        frame.show(k * 0.02)
+        assert frame.out == bytearray([255]) * len(frame.out)
+
+def test_exact_solid_is_held_and_fractional_solid_is_resent():
+    frame = _deep_frame(1.0)
+    frame.fill_rgb16(100 << 8, 20 << 8, 0)                      # whole output levels at gamma 1
+    assert frame.show(0.0)
+    assert not frame.show(0.02) and not frame.show(0.04)
+    assert frame.frames_sent == 1 and frame.frames_skipped == 2
+
+    frame.fill_rgb16(100 << 8 | 0x80, 20 << 8, 0)               # half a step left to dither
+    assert frame.show(0.06) and frame.show(0.08) and frame.show(0.10)
+    assert frame.frames_sent == 4 and frame.frames_skipped == 2
+
+def test_held_solid_is_resent_after_min_refresh_or_a_table_change():
+    frame = _deep_frame(1.0, min_refresh=1.0)
+    frame.fill_rgb16(100 << 8, 0, 0)
+    assert frame.show(0.0)
+    assert not frame.show(0.5)
+    assert frame.show(1.0)                                      # min_refresh ran out
+    frame.output.set_brightness(0.5)
+    assert frame.show(1.02)                                     # new table
+    assert not frame.show(1.04)
+
+SPLIT = (("D5", 4, "GRB"), ("D6", 4, "GRB"), ("D9", 4, "RGB"))
+
+def _split_frame(**kwargs):
+    hardware.reset()
+    return MultiFrameBuffer([(getattr(board, name), count, order) for name, count, order in SPLIT], **kwargs)
+
+def _shows():
+    return [hardware.strip(name).shows for name, _, _ in SPLIT]
+
+def _last(name, pixel):
+    data = hardware.strip(name).frames[-1][1]
+    return tuple(data[pixel * 3:pixel * 3 + 3])
+
+def test_split_sends_only_the_changed_strip():
+    frame = _split_frame()
+    frame.set_pixel(0, (1, 2, 3))
+    assert frame.show(0.0)
+    assert _shows() == [1, 1, 1]                                # nothing sent yet: every strip
+    frame.set_pixel(5, (9, 9, 9))                               # second strip
+    assert frame.show(0.02)
+    assert _shows() == [1, 2, 1]
+    assert not frame.show(0.04)
+    assert _shows() == [1, 2, 1]
+    assert list(frame.strip_sent) == [1, 2, 1]
+    assert list(frame.strip_skipped) == [2, 1, 2]
+    assert frame.frames_sent == 2 and frame.frames_skipped == 1
+
+def test_split_reorders_a_strip_with_another_pixel_order():
+    frame = _split_frame()
+    frame.set_pixel(1, (10, 20, 30))                            # GRB strip
+    frame.set_pixel(9, (10, 20, 30))                            # first pixel of the RGB strip
+    frame.show(0.0)
+    assert _last("D5", 1) == (20, 10, 30)
+    assert _last("D9", 1) == (10, 20, 30)
+    frame.set_pixel(9, (40, 50, 60))
+    frame.show(0.02)
+    assert _last("D9", 1) == (40, 50, 60)
+    assert _shows() == [1, 1, 2]
+
+def test_split_resends_every_strip_for_a_solid_or_min_refresh():
+    frame = _split_frame(min_refresh=1.0)
+    frame.fill((1, 2, 3))
+    frame.show(0.0)
+    frame.fill((4, 5, 6))                                       # a new solid is compared by color, not per strip
+    assert frame.show(0.02)
+    assert _shows() == [2, 2, 2]
+    frame.fill((4, 5, 6))
+    assert not frame.show(0.04)
+    assert frame.show(1.02)                                     # min_refresh ran out
+    assert _shows() == [3, 3, 3]
+    assert _last("D6", 0) == (5, 4, 6) and _last("D9", 0) == (4, 5, 6)
+
+def test_split_resends_every_strip_when_the_limiter_rescales():
+    output = OutputStage(1.0)
+    limiter = PowerLimiter(50.0, 12, "GRB", idle_ma=0.0)
+    frame = _split_frame(output=output, limiter=limiter)
+    frame.set_pixel(0, (20, 20, 20))
+    frame.show(0.0)
+    assert output.limit == 1.0
+    frame.set_pixel(1, (255, 255, 255))                         # first strip alone goes over budget
+    assert frame.show(0.02)
+    assert output.limit < 1.0
+    assert _shows() == [2, 2, 2]                                # dimmed table: all strips change
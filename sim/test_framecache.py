@@ -0,0 +1,91 @@
+# python -m pytest sim/test_framecache.py
+#
+# Checks the windows framecache.FrameSequence hands out for rotations and
+# wipes against frames built pixel by pixel, and FrameCache's LRU eviction.
+
+import pytest
+
+import sim
+
+sim.install(fast=True)
+
+from framebuffer import FrameBuffer                             # noqa: E402
+from framecache import FrameCache, FrameSequence, packed, rotation, wipes   # noqa: E402
+
+COLORS = ((255, 0, 0), (0, 255, 0), (0, 0, 255))
+
+def _grb(color):
+    return bytes((color[1], color[0], color[2]))
+
+def _wipe_frame(k, count):
+    """Frame k of a color chase: pixels up to k % count in the new color, the rest in the one before."""
+    new = COLORS[(k // count) % len(COLORS)]
+    old = COLORS[(k // count - 1) % len(COLORS)]
+    lit = k % count + 1
+    return _grb(new) * lit + _grb(old) * (count - lit)
+
+def test_wipes_match_a_pixel_by_pixel_chase():
+    count = 5
+    sequence = wipes(COLORS, count, "GRB")
+    assert sequence.frames == len(COLORS) * count and sequence.stride < 0
+    assert sequence.nbytes == (len(COLORS) + 1) * count * 3
+    for k in range(2 * sequence.frames + 1):                    # twice round, so the wrap is covered
+        assert bytes(sequence.window(k)) == _wipe_frame(k, count)
+
+def test_wipes_leave_off_a_white_channel():
+    sequence = wipes(((10, 20, 30), (40, 50, 60)), 2, "GRBW")
+    assert bytes(sequence.window(0)) == bytes((20, 10, 30, 0, 50, 40, 60, 0))
+
+def test_rotation_scrolls_toward_pixel_zero_and_wraps():
+    base = bytes(range(15))                                     # five 3-byte pixels
+    for shift, frames in ((1, 5), (2, 5), (5, 1)):
+        sequence = rotation(base, 3, shift)
+        assert sequence.frames == frames
+        for k in range(3 * frames):
+            start = (k * shift % 5) * 3
+            assert bytes(sequence.window(k)) == base[start:] + base[:start]
+
+def test_rotation_ends_when_the_pattern_repeats():
+    assert rotation(bytes(12), 3, 2).frames == 2                # four pixels, two at a time
+    assert rotation(bytes(18), 3, 4).frames == 3                # six pixels, four at a time
+
+def test_play_loads_the_window():
+    frame = FrameBuffer(5, "GRB")
+    sequence = wipes(COLORS, 5, "GRB")
+    sequence.play(frame, 7)
+    assert bytes(frame.buf) == _wipe_frame(7, 5)
+
+def test_packed_keeps_each_drawn_frame():
+    frame = FrameBuffer(2, "GRB")
+    sequence = packed(3, frame, lambda frame, k: frame.fill((k, 0, 0)))
+    assert [bytes(sequence.window(k)) for k in range(4)] == [_grb((k % 3, 0, 0)) * 2 for k in range(4)]
+
+def _sequence(nbytes):
+    return FrameSequence(bytearray(nbytes), nbytes, 1)
+
+def test_cache_evicts_the_least_recently_played():
+    cache = FrameCache(100)
+    a = cache.get("a", lambda: _sequence(40))
+    cache.get("b", lambda: _sequence(40))
+    assert cache.get("a", lambda: _sequence(40)) is a           # a hit: played again, not rebuilt
+    cache.get("c", lambda: _sequence(40))
+    assert sorted(cache.entries) == ["a", "c"]                  # b was played longest ago
+    assert cache.resident == 80 and cache.builds == 3 and cache.evictions == 1
+    cache.get("d", lambda: _sequence(90))                       # makes room by evicting both
+    assert list(cache.entries) == ["d"]
+    assert cache.resident == 90 and cache.evictions == 3
+
+def test_cache_stays_within_its_budget():
+    cache = FrameCache(100)
+    for i in range(20):
+        cache.get(i % 7, lambda: _sequence(30))
+        assert cache.resident <= cache.budget
+        assert cache.resident == 30 * len(cache.entries)
+    assert cache.builds == 20                                   # seven names cycled through three slots
+
+def test_cache_refuses_a_sequence_over_budget():
+    cache = FrameCache(100)
+    cache.get("a", lambda: _sequence(40))
+    with pytest.raises(ValueError):
+        cache.get("big", lambda: _sequence(101))
+    assert list(cache.entries) == ["a"] and cache.resident == 40
@@ -0,0 +1,62 @@
+# python -m pytest sim/test_helix.py
+#
+# Checks the per-LED angle and height tables helix.Helix builds at boot,
+# and the stripes they feed.
+
+import math
+
+import sim
+
+sim.install(fast=True)
+
+from helix import Helix                                         # noqa: E402
+
+def test_angle_steps_up_from_the_bottom_led():
+    helix = Helix(100, 7.8)
+    assert abs(helix.angle_step - 2 * math.pi * 7.8 / 100) < 1e-6
+    assert helix.angle[-1] == 0.0                               # index 0 is the top
+    for i in range(99):
+        assert abs(helix.angle[i] - helix.angle[i + 1] - helix.angle_step) < 1e-4
+    assert abs(helix.angle[0] + helix.angle_step - 2 * math.pi * 7.8) < 1e-3   # turns in all, one step past the top
+
+def test_angle8_wraps_once_a_turn():
+    helix = Helix(256, 2)                                       # 128 LEDs a turn: two angle8 steps apart
+    from_bottom = [int(v) for v in helix.angle8[::-1]]
+    assert from_bottom[:3] == [0, 2, 4]
+    assert from_bottom[127] == 254 and from_bottom[128] == 0    # a full turn reads 0 again
+    assert from_bottom[128:] == from_bottom[:128]
+
+def test_angle8_follows_the_float_angle():
+    helix = Helix(250, 7.8)
+    for i in range(250):
+        turn = float(helix.angle[i]) / (2 * math.pi)
+        expected = (turn - int(turn)) * 256
+        assert abs(int(helix.angle8[i]) - expected) <= 1 or abs(int(helix.angle8[i]) - expected) >= 255
+
+def test_height_spans_bottom_to_top():
+    helix = Helix(250, 7.8)
+    assert helix.height[-1] == 0.0 and abs(helix.height[0] - 1.0) < 1e-6
+    assert int(helix.height8[-1]) == 0 and int(helix.height8[0]) == 255
+    heights = [int(v) for v in helix.height8]
+    assert heights == sorted(heights, reverse=True)
+    for i in range(250):
+        assert abs(int(helix.height8[i]) - float(helix.height[i]) * 255) < 1
+
+def test_single_led_helix():
+    helix = Helix(1, 3)
+    assert helix.angle[0] == 0.0 and helix.height[0] == 0.0
+    assert int(helix.angle8[0]) == 0 and int(helix.height8[0]) == 0
+
+def test_stripes_peak_on_their_angles_and_rotate_with_phase():
+    helix = Helix(120, 4)                                       # 30 LEDs a turn
+    stripes = helix.stripes(3, 0.0)
+    assert all(0.0 <= v <= 1.0 + 1e-6 for v in stripes)
+    assert abs(stripes[-1] - 1.0) < 1e-6                        # bottom LED sits on a stripe
+    assert abs(helix.stripes(3, math.pi)[-1]) < 1e-6            # half a stripe period later it is between two
+    shifted = helix.stripes(3, 2 * math.pi)                     # a whole period: the same picture
+    assert all(abs(a - b) < 1e-4 for a, b in zip(stripes, shifted))
+    assert abs(stripes[-11] - 1.0) < 1e-4 and stripes[-6] < 1e-4   # next stripe a third of a turn up, a gap between
+
+def test_column_broadcasts_across_channels():
+    helix = Helix(10, 1)
+    assert helix.column(helix.height).shape == (10, 1)
@@ -0,0 +1,74 @@
+# python -m pytest sim/test_palettes.py
+#
+# Checks the gradient tables from palettes.py and their use by
+# effects.PaletteWave, with ulab backed by NumPy.
+
+import sim
+
+sim.install(fast=True)
+
+from colors import FIRESIDE, HARBOR                             # noqa: E402
+from framebuffer import FrameBuffer                             # noqa: E402
+from palettes import (GRADIENT_STEPS, PaletteCache, build_gradient,  # noqa: E402
+                      crossfade, gradient_array, sample)
+from ulab import numpy as np                                    # noqa: E402
+from utils import hex_to_rgb                                    # noqa: E402
+
+import effects                                                  # noqa: E402
+
+def _color(table, step):
+    return tuple(table[step * 3:step * 3 + 3])
+
+def test_gradient_passes_through_every_palette_color():
+    table = build_gradient(FIRESIDE)
+    assert len(table) == GRADIENT_STEPS * 3
+    for k, color in enumerate(FIRESIDE):
+        assert _color(table, k * GRADIENT_STEPS // len(FIRESIDE)) == hex_to_rgb(color)
+
+def test_unwrapped_gradient_ends_on_the_last_color():
+    table = build_gradient(FIRESIDE, wrap=False)
+    assert _color(table, 0) == hex_to_rgb(FIRESIDE[0])
+    assert _color(table, GRADIENT_STEPS - 1) == hex_to_rgb(FIRESIDE[-1])
+
+def test_sample_and_crossfade():
+    a = gradient_array(build_gradient(FIRESIDE))
+    b = gradient_array(build_gradient(HARBOR))
+    rgb = sample(a, np.array([0, 64, 255], dtype=np.uint8))
+    assert rgb.shape == (3, 3)
+    assert tuple(rgb[1]) == tuple(a[64])
+    assert (crossfade(a, b, 0.0) == a).all()
+    assert (crossfade(a, b, 1.0) == b).all()
+
+def test_crossfade_and_sample_into_out():
+    a = gradient_array(build_gradient(FIRESIDE))
+    b = gradient_array(build_gradient(HARBOR))
+    blend = np.zeros((GRADIENT_STEPS, 3), dtype=np.uint8)
+    assert crossfade(a, b, 0.25, blend) is blend
+    for step in (0, 100, 255):
+        for c in range(3):
+            assert blend[step][c] == int(a[step][c] * 0.75 + b[step][c] * 0.25 + 0.5)
+    colors = np.zeros((3, 3), dtype=np.uint8)
+    assert sample(blend, np.array([0, 100, 255], dtype=np.uint8), colors) is colors
+    assert tuple(colors[1]) == tuple(blend[100])
+
+def test_cache_keeps_at_most_max_resident():
+    cache = PaletteCache(max_resident=1)
+    first = cache.get(FIRESIDE)
+    assert cache.get(FIRESIDE) is first
+    cache.get(HARBOR)
+    assert list(cache.entries) == [HARBOR]
+
+def test_palette_wave_scrolls_and_fades():
+    frame = FrameBuffer(8, "GRB")
+    cache = PaletteCache()
+    wave = effects.PaletteWave(8, (FIRESIDE, HARBOR), cache, hold=1.0, fade=1.0, speed=32.0)
+    wave.start(10.0)
+    wave.step(frame, 10.0)
+    r, g, b = hex_to_rgb(FIRESIDE[0])
+    assert tuple(frame.buf[0:3]) == (g, r, b)                   # pixel 0 starts on the first color, in GRB
+    wave.step(frame, 10.25)
+    assert list(wave.indices[:2]) == [8, 40]                    # 8 steps scrolled, 32 steps between pixels
+    wave.step(frame, 12.0)                                      # one full cycle: now on HARBOR alone
+    harbor = gradient_array(build_gradient(HARBOR))
+    assert tuple(frame.wire[0]) == (harbor[wave.indices[0]][1], harbor[wave.indices[0]][0],
+                                    harbor[wave.indices[0]][2])
@@ -0,0 +1,128 @@
+# python -m pytest sim/test_playlist.py
+#
+# Checks playlist.Playlist's weighted shuffle and what Sequencer times and
+# blends, with effect steps timed on the simulated clock.
+
+import random
+
+import sim
+
+sim.install(fast=True)
+
+from sim import hardware                                        # noqa: E402
+
+from effects import Lightning                                   # noqa: E402
+from framebuffer import FrameBuffer                             # noqa: E402
+from playlist import Playlist, Sequencer, register              # noqa: E402
+
+class Solid:
+    """Fills the frame with one color and takes cost seconds doing it."""
+
+    def __init__(self, color, cost=0.0):
+        self.color = color
+        self.cost = cost
+        self.starts = 0
+
+    def start(self, now):
+        self.starts += 1
+
+    def step(self, frame, now):
+        hardware.clock.advance(self.cost)
+        frame.fill(self.color)
+        return True
+
+def test_shuffle_never_repeats_and_follows_the_weights():
+    random.seed(1)
+    playlist = Playlist((("a", 1.0, 6), ("b", 1.0, 3), ("c", 1.0, 1)), shuffle=True)
+    previous = None
+    counts = {"a": 0, "b": 0, "c": 0}
+    for _ in range(20000):
+        name = playlist.next()[0]
+        assert name != previous
+        counts[name] += 1
+        previous = name
+    # after a, b and c follow 3:1; after b, a and c 6:1; after c, a and b 6:3
+    assert 0.42 < counts["a"] / 20000 < 0.48
+    assert 0.34 < counts["b"] / 20000 < 0.40
+    assert 0.15 < counts["c"] / 20000 < 0.20
+
+def test_single_entry_shuffle_repeats_itself():
+    playlist = Playlist((("a", 1.0, 1),), shuffle=True)
+    assert [playlist.next()[0] for _ in range(3)] == ["a", "a", "a"]
+
+def test_overruns_are_counted_per_effect():
+    hardware.reset()
+    register("cheap", lambda: Solid((10, 0, 0), 0.005))
+    register("costly", lambda: Solid((0, 10, 0), 0.03))
+    frame = FrameBuffer(4, "GRB")
+    sequencer = Sequencer(frame, Playlist((("cheap", 1.0, 1), ("costly", 1.0, 1))), crossfade=0.0,
+                          budget=0.02)
+    sequencer.start(0.0)
+    for i in range(40):
+        sequencer.step(i * 0.1)
+    cheap, costly = sequencer.stats["cheap"], sequencer.stats["costly"]   # [frames, total us, max us, overruns]
+    assert cheap[0] + costly[0] == 40 and cheap[0] >= 15 and costly[0] >= 15
+    assert cheap[3] == 0 and 4900 <= cheap[2] <= 5100
+    assert costly[3] == costly[0] and 29900 <= costly[2] <= 30100
+
+def test_crossfade_blends_in_integers():
+    hardware.reset()
+    register("red", lambda: Solid((200, 0, 0)))
+    register("blue", lambda: Solid((0, 0, 100)))
+    frame = FrameBuffer(4, "GRB")
+    sequencer = Sequencer(frame, Playlist((("red", 0.0, 1), ("blue", 5.0, 1))), crossfade=1.0)
+    sequencer.start(0.0)
+    sequencer.step(0.0)                                         # red, and the fade to blue begins
+    assert tuple(frame.wire[0]) == (0, 200, 0)
+    sequencer.step(0.25)
+    assert tuple(frame.wire[0]) == (0, 150, 25)                 # GRB: 3/4 red, 1/4 blue
+    sequencer.step(0.5)
+    assert tuple(frame.wire[3]) == (0, 100, 50)
+    sequencer.step(1.0)
+    assert tuple(frame.wire[0]) == (0, 0, 100)
+    assert sequencer.instances["red"].starts == 1 and sequencer.instances["blue"].starts == 1
+
+STALE = (0, 77, 0)                                              # what an earlier crossfade left behind
+
+def _blend(a, b, amount):
+    weight = int(amount * 256)
+    return bytes((x * (256 - weight) + y * weight) >> 8 for x, y in zip(a, b))
+
+def _stale(sequencer):
+    sequencer.scratch_a.fill(STALE)
+    sequencer.scratch_b.fill(STALE)
+
+def test_fade_out_of_a_finished_lightning_shows_no_stale_bytes():
+    random.seed(2)
+    hardware.reset()
+    register("bolt", Lightning)
+    register("blue", lambda: Solid((0, 0, 100)))
+    frame = FrameBuffer(20, "GRB")
+    sequencer = Sequencer(frame, Playlist((("bolt", 5.0, 1), ("blue", 5.0, 1))), crossfade=1.0)
+    sequencer.start(0.0)
+    sequencer.step(0.0)                                         # leader over the first pixels
+    last = bytes(frame.buf)
+    assert last[:3] != bytes(3) and last[-3:] == bytes(3)
+    _stale(sequencer)
+    sequencer.instances["bolt"].stop()                          # finished: stepped, but draws nothing
+    sequencer.step(0.02)
+    assert sequencer.incoming[0] == "blue"
+    blue = bytes((0, 0, 100)) * 20
+    for now in (0.27, 0.52, 0.77):
+        sequencer.step(now)
+        assert bytes(frame.buf) == _blend(last, blue, now - 0.02)
+
+def test_fade_into_lightning_starts_from_black():
+    random.seed(2)
+    hardware.reset()
+    register("red", lambda: Solid((200, 0, 0)))
+    register("bolt", Lightning)
+    frame = FrameBuffer(20, "GRB")
+    sequencer = Sequencer(frame, Playlist((("red", 0.0, 1), ("bolt", 5.0, 1))), crossfade=1.0)
+    sequencer.start(0.0)
+    _stale(sequencer)
+    sequencer.step(0.0)                                         # red, and the fade into the bolt begins
+    sequencer.step(0.5)                                         # leader has drawn pixels 0-4 only
+    red = bytes((0, 200, 0))
+    for pixel in range(5, 20):
+        assert bytes(frame.wire[pixel]) == _blend(red, bytes(3), 0.5)
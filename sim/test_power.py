@@ -0,0 +1,73 @@
+# python -m pytest sim/test_power.py
+#
+# Checks how power.PowerLimiter estimates a frame's current and steps the
+# output stage's limit down over budget and back up again.
+
+import sim
+
+sim.install(fast=True)
+
+from ulab import numpy as np                                    # noqa: E402
+
+from framebuffer import OutputStage                             # noqa: E402
+from power import PowerLimiter                                  # noqa: E402
+
+COUNT = 10                                                      # 10 mA idle, 600 mA more at full white
+
+def _rig(budget_ma):
+    output = OutputStage(1.0)
+    return PowerLimiter(budget_ma, COUNT, "GRB", idle_ma=1.0), output
+
+def _show(limiter, output, level):
+    """Output a solid frame as FrameBuffer.show() does. Returns True if the limit changed."""
+    raw = np.full(COUNT * 3, level, dtype=np.uint8)
+    out = np.zeros(COUNT * 3, dtype=np.uint8)
+    output.apply(raw, out)
+    return limiter.check(out, output)
+
+def test_estimate_weights_each_channel():
+    limiter = PowerLimiter(1000.0, 2, "GRB", channel_ma=(10.0, 20.0, 40.0), idle_ma=0.5)
+    out = np.array([255, 0, 0, 0, 255, 255], dtype=np.uint8)   # G of pixel 0, R and B of pixel 1
+    assert abs(limiter.estimate(out) - (1.0 + 20.0 + 10.0 + 40.0)) < 1e-3
+    out = np.array([51, 51, 51, 51, 51, 51], dtype=np.uint8)
+    assert abs(limiter.estimate(out) - (1.0 + 2 * 70.0 * 0.2)) < 1e-3
+
+def test_steps_down_over_budget():
+    limiter, output = _rig(320.0)
+    assert _show(limiter, output, 255)
+    assert output.limit == 0.5                                  # 310 mA of light fits out of 600
+    assert abs(limiter.estimate_ma - 610.0) < 0.1
+    assert not _show(limiter, output, 255)                      # the rescaled frame holds the step
+    assert output.limit == 0.5 and limiter.throttled == 2
+
+def test_steps_back_up_only_with_hysteresis_to_spare():
+    limiter, output = _rig(320.0)                               # hysteresis 16 mA
+    _show(limiter, output, 255)
+    assert _show(limiter, output, 128)                          # ~301 mA: fits, but not with the margin
+    assert 0.5 < output.limit < 1.0
+    held = output.limit
+    for _ in range(5):                                          # sitting at the budget does not flap
+        assert not _show(limiter, output, 128)
+        assert output.limit == held
+    assert _show(limiter, output, 100)                          # ~235 mA fits with margin
+    assert output.limit == 1.0
+    assert not _show(limiter, output, 128)                      # unthrottled and under budget: stays up
+    assert _show(limiter, output, 255)
+    assert output.limit == 0.5
+
+def test_never_steps_to_zero_while_light_fits():
+    limiter, output = _rig(11.0)                                # 1 mA of light to spare
+    _show(limiter, output, 255)
+    assert output.limit == 1 / 32
+    for _ in range(5):
+        assert not _show(limiter, output, 255)
+    assert output.limit == 1 / 32
+
+def test_budget_under_idle_holds_the_limit_at_zero():
+    limiter, output = _rig(5.0)                                 # 10 mA idle draw alone is over
+    assert _show(limiter, output, 255)
+    assert output.limit == 0.0
+    for level in (255, 10, 0, 200):                             # an all-dark frame must not lift it again
+        assert not _show(limiter, output, level)
+        assert output.limit == 0.0
+    assert limiter.lowest_limit == 0.0
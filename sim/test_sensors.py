@@ -0,0 +1,156 @@
+# python -m pytest sim/test_sensors.py
+#
+# Drives sensors.RangeSensor and sensors.SensorArray through the
+# register-level fake VL6180X in sim/vl6180x.py on the simulated I2C bus.
+
+import pytest
+
+import sim
+from sim import hardware, vl6180x
+
+sim.install(fast=True)
+
+import board                                                    # noqa: E402  (stand-ins)
+import busio                                                    # noqa: E402
+
+from sensors import RangeSensor, SensorArray                    # noqa: E402
+
+ADDRESS = 0x29
+PERIOD = 0.1
+
+@pytest.fixture
+def rig():
+    hardware.reset()
+    device = vl6180x.attach(ADDRESS)
+    hardware.set_range_trace(ADDRESS, [(0.0, 100)])
+    sensor = RangeSensor(busio.I2C(board.SCL, board.SDA), ADDRESS, PERIOD)
+    return sensor, device
+
+def _now():
+    return hardware.clock.monotonic()
+
+def _ready(device):
+    return device.registers[vl6180x.RESULT__INTERRUPT_STATUS_GPIO] & 0x07
+
+def _next_sample(sensor):
+    """Advance to just past the next conversion and poll it."""
+    hardware.clock.advance(PERIOD)
+    return sensor.poll(_now())
+
+def test_waits_for_the_start_delay(rig):
+    sensor, device = rig
+    sensor.start(_now(), 0.05)
+    assert not sensor.poll(_now())
+    assert not sensor.running and not device.continuous        # nothing written before the delay
+    hardware.clock.advance(0.05)
+    assert not sensor.poll(_now())                              # this poll only starts ranging
+    assert sensor.running and device.continuous
+    assert device.registers[vl6180x.SYSRANGE__INTERMEASUREMENT_PERIOD] == int(PERIOD * 100) - 1
+
+def test_no_sample_until_a_conversion_finishes(rig):
+    sensor, device = rig
+    sensor.start(_now())
+    sensor.poll(_now())
+    assert not sensor.poll(_now())
+    assert sensor.samples == 0 and sensor.value == 0
+
+def test_reads_a_ready_sample_and_clears_the_interrupt(rig):
+    sensor, device = rig
+    sensor.start(_now())
+    sensor.poll(_now())
+    assert _next_sample(sensor)
+    assert sensor.value == 100 and sensor.status == 0 and not sensor.fault
+    assert sensor.samples == 1
+    assert _ready(device) == 0                                  # cleared, so the next poll sees nothing new
+    assert not sensor.poll(_now())
+    hardware.set_range_trace(ADDRESS, [(0.0, 42)])
+    assert _next_sample(sensor)
+    assert sensor.value == 42 and sensor.samples == 2
+
+def test_reports_faults_but_not_missing_targets(rig):
+    sensor, device = rig
+    sensor.start(_now())
+    sensor.poll(_now())
+    device.fault_status = 5
+    assert _next_sample(sensor)
+    assert sensor.status == 5 and sensor.fault
+    device.fault_status = 0
+    hardware.set_range_trace(ADDRESS, [(0.0, 255)])
+    assert _next_sample(sensor)
+    assert sensor.status == vl6180x.NO_TARGET_STATUS and not sensor.fault
+
+def test_stop_halts_continuous_ranging(rig):
+    sensor, device = rig
+    sensor.start(_now())
+    sensor.poll(_now())
+    sensor.stop()
+    assert not sensor.running and not device.continuous
+    hardware.clock.advance(PERIOD)
+    assert not sensor.poll(_now())
+
+OTHER = 0x30
+
+def _array(budget):
+    hardware.reset()
+    i2c = busio.I2C(board.SCL, board.SDA)
+    for address, mm in ((ADDRESS, 100), (OTHER, 200)):
+        vl6180x.attach(address)
+        hardware.set_range_trace(address, [(0.0, mm)])
+    return SensorArray([RangeSensor(i2c, address, PERIOD) for address in (ADDRESS, OTHER)], budget)
+
+def _started(sensors):
+    sensors.start(_now())
+    for _ in range(4):                                          # the second start is staggered by PERIOD / 2
+        sensors.poll(_now())
+        hardware.clock.advance(PERIOD / 2)
+    assert all(sensor.running for sensor in sensors.sensors)
+
+def test_array_checks_one_sensor_per_poll_on_a_tight_budget():
+    sensors = _array(0.00001)                                   # less than a single register read
+    _started(sensors)
+    checks = list(sensors.checks)
+    first = sensors.next
+    skipped = sensors.over_budget
+    for i in range(6):
+        sensors.poll(_now())
+        assert sensors.next == (first + i + 1) % 2              # round robin: one sensor, then the other
+    assert [sensors.checks[k] - checks[k] for k in range(2)] == [3, 3]
+    assert sensors.over_budget - skipped == 6
+    assert max(sensors.latency_us) >= sensors.budget_ns // 1000
+
+def test_array_checks_every_sensor_within_a_wide_budget():
+    sensors = _array(0.01)
+    _started(sensors)
+    checks = list(sensors.checks)
+    hardware.clock.advance(PERIOD)
+    assert sensors.poll(_now()) == 2
+    assert list(sensors.values) == [100, 200]
+    assert [sensors.checks[k] - checks[k] for k in range(2)] == [1, 1]
+    assert sensors.over_budget == 0
+
+def test_array_clears_stale_updated_flags():
+    sensors = _array(0.01)
+    _started(sensors)
+    hardware.clock.advance(PERIOD)
+    sensors.poll(_now())
+    assert list(sensors.updated) == [1, 1]
+    readings = list(sensors.readings)
+    assert sensors.poll(_now()) == 0                            # nothing new since the last poll
+    assert list(sensors.updated) == [0, 0]
+    assert list(sensors.readings) == readings
+
+def test_array_counts_an_i2c_error_and_keeps_polling_the_other_sensor():
+    sensors = _array(0.01)
+    _started(sensors)
+    del hardware.i2c_devices[OTHER]                             # unplugged: the next transfer raises OSError
+    hardware.set_range_trace(ADDRESS, [(0.0, 150)])
+    readings = list(sensors.readings)
+    hardware.clock.advance(PERIOD)
+    assert sensors.poll(_now()) == 1
+    assert list(sensors.errors) == [0, 1]
+    assert list(sensors.updated) == [1, 0]
+    assert list(sensors.values) == [150, 200]                   # the lost sensor keeps its last range
+    hardware.clock.advance(PERIOD)
+    assert sensors.poll(_now()) == 1
+    assert list(sensors.errors) == [0, 2]
+    assert list(sensors.readings) == [readings[0] + 2, readings[1]]
@@ -0,0 +1,32 @@
+# python -m pytest sim/test_tables.py
+#
+# Checks the integer color tables from utils.py against their float
+# reference, hue_value_to_rgb(), on the host.
+
+import pytest
+
+from utils import (HUE_STEPS, build_hue_table, build_hue_index_table, build_value_table,
+                   check_hue_table, hue_value_lookup)
+
+def test_hue_table_matches_reference():
+    assert check_hue_table(build_hue_table()) <= 1
+
+def test_check_hue_table_rejects_a_wrong_table():
+    table = build_hue_table()
+    table[HUE_STEPS // 3 * 3 + 1] ^= 0x40                       # one channel of one hue step
+    with pytest.raises(ValueError):
+        check_hue_table(table)
+
+def test_lookup_stays_in_range():
+    table = build_hue_table()
+    for step in (0, HUE_STEPS // 2, HUE_STEPS - 1):
+        assert hue_value_lookup(table, step, 0) == (0, 0, 0)
+        assert max(hue_value_lookup(table, step, 255)) == 255
+
+def test_sensor_tables_cover_every_reading():
+    hue_index = build_hue_index_table(1, 180)
+    value = build_value_table(1, 180)
+    assert len(hue_index) == 256 and len(value) == 256
+    assert all(0 <= step < HUE_STEPS for step in hue_index)
+    assert value[255] == 0                                      # no target: dark
+    assert value[1] == 255                                      # closest: full
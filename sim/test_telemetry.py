@@ -0,0 +1,95 @@
+# python -m pytest sim/test_telemetry.py
+#
+# Packs records with telemetry.Telemetry and reads them back with
+# sim/decode_telemetry.py, from raw data-port bytes and from KT: console lines.
+
+import sim
+
+sim.install(fast=True)
+
+from profiler import StageProfiler                              # noqa: E402
+from sim import decode_telemetry                                # noqa: E402
+from telemetry import (CONSOLE_PREFIX, FIELDS, FLAG_ATTRACT,    # noqa: E402
+                       FLAG_PRESENT, RECORD_SIZE, Telemetry)
+
+class Port:
+    """Collects what would go out over usb_cdc.data."""
+
+    def __init__(self):
+        self.connected = True
+        self.write_timeout = None
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+class Counts:
+    def __init__(self, **counts):
+        self.__dict__.update(counts)
+
+def _profiler():
+    stats = StageProfiler()
+    for stage, elapsed in ((0, 100), (0, 300), (1, 50), (2, 1000), (3, 70000)):
+        stats.record(stage, elapsed)
+    return stats
+
+def _record(telemetry):
+    frame = Counts(frames_sent=40, frames_skipped=10)
+    governor = Counts(late=3, dropped=0x10002)
+    telemetry.record(1.5, 120, 340, FLAG_PRESENT, frame, governor)
+    telemetry.record(2.25, 0, 0, FLAG_ATTRACT)
+
+def _check(records):
+    first, second = (dict(zip(FIELDS, record)) for record in records)
+    assert (first["seq"], first["ms"], first["x"], first["y"]) == (0, 1500, 120, 340)
+    assert (first["sent"], first["skipped"], first["late"], first["dropped"]) == (40, 10, 3, 2)
+    assert (first["sensor_avg"], first["compute_avg"], first["render_avg"]) == (200, 50, 1000)
+    assert first["show_avg"] == first["show_max"] == 0xFFFF   # capped, not wrapped
+    assert (first["sensor_max"], first["telemetry_avg"], first["telemetry_max"]) == (300, 0, 0)
+    assert first["flags"] == FLAG_PRESENT
+    assert (second["seq"], second["ms"], second["sent"], second["late"]) == (1, 2250, 0, 0)
+    assert second["flags"] == FLAG_ATTRACT
+
+def test_raw_records_round_trip(tmp_path):
+    port = Port()
+    telemetry = Telemetry(_profiler(), batch=4, port=port)
+    _record(telemetry)
+    assert telemetry.flush(3.0)
+    assert port.write_timeout == 0 and len(port.data) == 2 * RECORD_SIZE
+    stats = {"bad": 0}
+    records, consumed = decode_telemetry.decode_bytes(bytes(port.data), stats)
+    assert consumed == len(port.data) and stats["bad"] == 0
+    _check(records)
+
+    capture = tmp_path / "capture.bin"
+    capture.write_bytes(port.data)
+    _check(list(decode_telemetry.open_records(str(capture), stats)))
+
+def test_console_records_round_trip(tmp_path, capsys):
+    telemetry = Telemetry(_profiler(), batch=4, port=None)
+    telemetry.port = None                                       # no data port: hex on the console
+    _record(telemetry)
+    print("other console output")
+    assert telemetry.flush(3.0)
+    out = capsys.readouterr().out
+    assert out.splitlines()[-1].startswith(CONSOLE_PREFIX)
+    stats = {"bad": 0}
+    _check(list(decode_telemetry.decode_console(out.splitlines(), stats)))
+    assert stats["bad"] == 0
+
+    log = tmp_path / "console.log"
+    log.write_text(out)
+    _check(list(decode_telemetry.open_records(str(log), stats)))
+
+def test_checksum_rejects_a_damaged_record():
+    port = Port()
+    telemetry = Telemetry(batch=4, port=port)
+    for i in range(3):
+        telemetry.record(i, i, i)
+    telemetry.flush(3.0)
+    data = bytearray(port.data)
+    data[RECORD_SIZE + 6] ^= 0x01                               # one bit of the second record's time
+    stats = {"bad": 0}
+    records, _ = decode_telemetry.decode_bytes(bytes(data), stats)
+    assert stats["bad"] == 1
+    assert [record[0] for record in records] == [0, 2]          # resynced on the third record's magic
@@ -0,0 +1,104 @@
+# vl6180x.py
+#
+# Register-level fake VL6180X for the simulated I2C bus. It implements the
+# single-shot and continuous ranging state machine closely enough to test
+# drivers that poll RESULT__INTERRUPT_STATUS_GPIO: results appear only once
+# a conversion has had time to finish, and stay latched until cleared.
+# Range values come from the trace set for the device's address.
+
+from sim import hardware
+
+MODEL_ID = 0xB4
+
+IDENTIFICATION__MODEL_ID = 0x000
+SYSTEM__INTERRUPT_CLEAR = 0x015
+SYSTEM__FRESH_OUT_OF_RESET = 0x016
+SYSRANGE__START = 0x018
+SYSRANGE__INTERMEASUREMENT_PERIOD = 0x01B
+RESULT__RANGE_STATUS = 0x04D
+RESULT__INTERRUPT_STATUS_GPIO = 0x04F
+RESULT__RANGE_VAL = 0x062
+I2C_SLAVE__DEVICE_ADDRESS = 0x212
+
+CONVERSION_SECONDS = 0.008                                      # time from start to result ready
+NO_TARGET_MM = 255
+NO_TARGET_STATUS = 11                                           # convergence failure, nothing in range
+
+class FakeVL6180X:
+    def __init__(self, address):
+        self.address = address
+        self.registers = bytearray(0x300)
+        self.registers[IDENTIFICATION__MODEL_ID] = MODEL_ID
+        self.registers[SYSTEM__FRESH_OUT_OF_RESET] = 1
+        self.registers[I2C_SLAVE__DEVICE_ADDRESS] = address
+        self.registers[RESULT__RANGE_STATUS] = 0x01              # device ready
+        self.pointer = 0
+        self.continuous = False
+        self.next_result = None                                 # clock time of the next conversion result
+        self.conversions = 0
+        self.overruns = 0                                       # results replaced before being cleared
+        self.fault_status = 0                                   # nonzero: every result reports this range status
+
+    # I2C side: the first two bytes of a write set the register pointer,
+    # further bytes are written with auto-increment, and reads continue
+    # from the pointer.
+
+    def write(self, data):
+        if len(data) < 2:
+            return
+        self.pointer = (data[0] << 8) | data[1]
+        for value in data[2:]:
+            self._store(self.pointer, value)
+            self.pointer += 1
+
+    def read(self, count):
+        self._update()
+        data = bytes(self.registers[self.pointer:self.pointer + count])
+        self.pointer += count
+        return data
+
+    def _store(self, register, value):
+        now = hardware.clock.monotonic()
+        if register == SYSRANGE__START:
+            if value & 0x02:                                    # continuous mode: start/stop toggles
+                if self.continuous:
+                    self.continuous = False
+                    self.next_result = None
+                elif value & 0x01:
+                    self.continuous = True
+                    self.next_result = now + CONVERSION_SECONDS
+            elif value & 0x01:                                  # single shot
+                self.next_result = now + CONVERSION_SECONDS
+            return
+        if register == SYSTEM__INTERRUPT_CLEAR:
+            if value & 0x01:
+                self.registers[RESULT__INTERRUPT_STATUS_GPIO] &= ~0x07 & 0xFF
+            return
+        self.registers[register] = value
+
+    def _period(self):
+        return (self.registers[SYSRANGE__INTERMEASUREMENT_PERIOD] + 1) * 0.01
+
+    def _update(self):
+        now = hardware.clock.monotonic()
+        while self.next_result is not None and self.next_result <= now:
+            if self.registers[RESULT__INTERRUPT_STATUS_GPIO] & 0x07:
+                self.overruns += 1
+            mm = hardware.range_at(self.address)
+            status = self.fault_status or (NO_TARGET_STATUS if mm >= NO_TARGET_MM else 0)
+            self.registers[RESULT__RANGE_VAL] = min(255, max(0, mm))
+            self.registers[RESULT__RANGE_STATUS] = (status << 4) | 0x01
+            self.registers[RESULT__INTERRUPT_STATUS_GPIO] = (self.registers[RESULT__INTERRUPT_STATUS_GPIO] & ~0x07 & 0xFF) | 0x04
+            self.conversions += 1
+            if self.continuous:
+                self.next_result += max(self._period(), CONVERSION_SECONDS)
+            else:
+                self.next_result = None
+
+def attach(address):
+    """Wire a fake VL6180X to the simulated I2C bus, if one is not there already."""
+    device = hardware.i2c_devices.get(address)
+    if device is None:
+        device = FakeVL6180X(address)
+        hardware.i2c_devices[address] = device
+    return device
@@ -0,0 +1,119 @@
+# telemetry.py
+
+import binascii
+import gc
+import struct
+
+try:
+    import usb_cdc
+except ImportError:
+    usb_cdc = None
+
+# One record, little-endian, RECORD_SIZE bytes:
+#   magic "KT", sequence, time (ms), x (mm), y (mm), frames sent, frames skipped,
+#   late frames, dropped frames, heap free, five stage averages (us), five stage
+#   maxima (us), flags, checksum (low byte of the sum of every byte before it).
+# sim/decode_telemetry.py unpacks the same layout.
+MAGIC = b"KT"
+RECORD_FORMAT = "<2sHIHHIIHHI5H5HBB"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+FIELDS = ("seq", "ms", "x", "y", "sent", "skipped", "late", "dropped", "mem_free",
+          "sensor_avg", "compute_avg", "render_avg", "show_avg", "telemetry_avg",
+          "sensor_max", "compute_max", "render_max", "show_max", "telemetry_max",
+          "flags")
+CONSOLE_PREFIX = "KT:"                                          # hex-encoded batches when there is no data port
+
+FLAG_PRESENT = 0x01
+FLAG_ATTRACT = 0x02
+FLAG_BUTTON = 0x04
+
+def data_port():
+    """usb_cdc.data if boot.py enabled it, otherwise None."""
+    if usb_cdc is None:
+        return None
+    return usb_cdc.data
+
+def _us(value):
+    return value if value < 0xFFFF else 0xFFFF
+
+def _average(stats, stage):
+    """Mean microseconds of one profiler stage, 0 without a profiler."""
+    if stats is None:
+        return 0
+    count = stats.count[stage]
+    return _us(stats.total_us[stage] // count) if count else 0
+
+def _peak(stats, stage):
+    return _us(stats.max_us[stage]) if stats is not None else 0
+
+class Telemetry:
+    """
+    Fixed-size binary telemetry records, packed with struct.pack_into into
+    one preallocated batch buffer. record() is cheap enough to call several
+    times a second. flush() sends the batch at most once per flush_interval:
+    raw bytes over usb_cdc.data when it is enabled (never blocking, and not
+    at all while no host has the port open), otherwise one hex line on the
+    console. Records made while the batch is full are counted in dropped.
+    """
+
+    def __init__(self, stage_profiler=None, batch=16, flush_interval=1.0, port=None):
+        self.profiler = stage_profiler
+        self.batch = batch
+        self.flush_interval = flush_interval
+        self.buf = bytearray(RECORD_SIZE * batch)
+        self.view = memoryview(self.buf)
+        self.used = 0
+        self.seq = 0
+        self.records = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.next_flush = 0.0
+        self.port = port if port is not None else data_port()
+        if self.port is not None:
+            self.port.write_timeout = 0                         # drop bytes rather than stall the loop
+
+    def record(self, now, x, y, flags=0, frame=None, governor=None):
+        if self.used == self.batch:
+            self.dropped += 1
+            return False
+        offset = self.used * RECORD_SIZE
+        sent = skipped = late = dropped = 0
+        if frame is not None:
+            sent = frame.frames_sent
+            skipped = frame.frames_skipped
+        if governor is not None:
+            late = governor.late & 0xFFFF
+            dropped = governor.dropped & 0xFFFF
+        stats = self.profiler
+        struct.pack_into(RECORD_FORMAT, self.buf, offset, MAGIC,
+                         self.seq & 0xFFFF, int(now * 1000) & 0xFFFFFFFF, x, y,
+                         sent, skipped, late, dropped, gc.mem_free(),
+                         _average(stats, 0), _average(stats, 1), _average(stats, 2),
+                         _average(stats, 3), _average(stats, 4),
+                         _peak(stats, 0), _peak(stats, 1), _peak(stats, 2),
+                         _peak(stats, 3), _peak(stats, 4),
+                         flags, 0)
+        checksum = 0
+        buf = self.buf
+        for i in range(offset, offset + RECORD_SIZE - 1):
+            checksum += buf[i]
+        buf[offset + RECORD_SIZE - 1] = checksum & 0xFF
+        self.used += 1
+        self.seq += 1
+        self.records += 1
+        return True
+
+    def flush(self, now, force=False):
+        """Send the pending batch if flush_interval has passed. Returns True if sent."""
+        if not self.used or (now < self.next_flush and not force):
+            return False
+        pending = self.view[:self.used * RECORD_SIZE]
+        if self.port is not None:
+            if self.port.connected:
+                self.port.write(pending)
+        else:
+            print(CONSOLE_PREFIX + binascii.hexlify(pending).decode())
+        self.used = 0
+        self.flushes += 1
+        self.next_flush = now + self.flush_interval
+        return True
@@ -1,6 +1,6 @@
 # utils.py
 
-gamma_table = [int((i / 255) ** 2.2 * 255 + 0.5) for i in range(256)] # poplulate a pre-calculated table for gamma correction to avoid run-time floating-point math
+from array import array
 
 def hex_to_rgb(hex_color):
     r = (hex_color >> 16) & 0xFF
@@ -12,10 +12,6 @@ def rgb_fade(rgb_tuple, fade_factor):
     r, g, b = rgb_tuple
     return (int(r * fade_factor), int(g * fade_factor), int(b * fade_factor))
 
-def gamma_correct(rgb_tuple):
-    r, g, b = rgb_tuple
-    return (gamma_table[r], gamma_table[g], gamma_table[b])
-
 def hue_value_to_rgb(h, v):
     """
     Convert a hue angle (0–360) and value (0–255) to an RGB tuple (0–255).
@@ -50,4 +46,97 @@ def hue_value_to_rgb(h, v):
     else:
         r, g, b = v, p, q
 
-    return (int(r * 255), int(g * 255), int(b * 255))
\ No newline at end of file
+    return (int(r * 255), int(g * 255), int(b * 255))
+
+def scale_sensor_value(raw_value, input_min, input_max):
+    """(raw value, min input, max input) return int (0-255)"""
+    if input_max == input_min:
+        return 0
+    if raw_value < input_min:
+        return 0
+    if raw_value > input_max:
+        return 255
+    scaled = (raw_value - input_min) / (input_max - input_min)
+    return int(scaled * 255)
+
+# Lookup tables for the proximity/hue path. The VL6180X reports 0-255 mm,
+# so every table is indexed directly by a raw reading and all float math
+# happens once at boot.
+HUE_STEPS = 256
+
+def build_hue_table():
+    """
+    Return a bytearray of HUE_STEPS x RGB at full value, taken from
+    hue_value_to_rgb() so the reference stays the single source of truth.
+    """
+    table = bytearray(HUE_STEPS * 3)
+    for i in range(HUE_STEPS):
+        r, g, b = hue_value_to_rgb(i * 360 / HUE_STEPS, 255)
+        table[i * 3] = r
+        table[i * 3 + 1] = g
+        table[i * 3 + 2] = b
+    return table
+
+def build_hue_index_table(input_min, input_max):
+    """Raw reading -> hue step. A full-scale reading wraps to red, like 360 degrees does."""
+    table = bytearray(256)
+    for raw in range(256):
+        table[raw] = (scale_sensor_value(raw, input_min, input_max) * HUE_STEPS // 255) % HUE_STEPS
+    return table
+
+def build_value_table(input_min, input_max):
+    """Raw reading -> value (0-255), inverted and squared so closer = brighter."""
+    table = bytearray(256)
+    for raw in range(256):
+        inverted = 255 - scale_sensor_value(raw, input_min, input_max)
+        table[raw] = inverted * inverted // 255
+    return table
+
+def build_value_table16(input_min, input_max):
+    """build_value_table() in 8.8 fixed point, for frames with dithered output."""
+    table = array("H", [0] * 256)
+    for raw in range(256):
+        inverted = 255 - scale_sensor_value(raw, input_min, input_max)
+        table[raw] = inverted * inverted * 256 // 255
+    return table
+
+def hue_value_lookup(hue_table, hue_index, value):
+    """Integer equivalent of hue_value_to_rgb() using a table from build_hue_table()."""
+    i = hue_index * 3
+    return ((hue_table[i] * value + 255) >> 8,
+            (hue_table[i + 1] * value + 255) >> 8,
+            (hue_table[i + 2] * value + 255) >> 8)
+
+def hue_value_fill(frame, hue_table, hue_index, value):
+    """hue_value_lookup() straight into frame.fill_rgb(), without the color tuple."""
+    i = hue_index * 3
+    frame.fill_rgb((hue_table[i] * value + 255) >> 8,
+                   (hue_table[i + 1] * value + 255) >> 8,
+                   (hue_table[i + 2] * value + 255) >> 8)
+
+def hue_value_fill16(frame, hue_table, hue_index, value16):
+    """hue_value_fill() with an 8.8 value from build_value_table16(), into frame.fill_rgb16()."""
+    i = hue_index * 3
+    frame.fill_rgb16((hue_table[i] * value16 + 255) >> 8,
+                     (hue_table[i + 1] * value16 + 255) >> 8,
+                     (hue_table[i + 2] * value16 + 255) >> 8)
+
+def check_hue_table(hue_table, tolerance=1):
+    """
+    Compare hue_value_lookup() against hue_value_to_rgb() for every hue step
+    and value. Returns the largest channel error; raises ValueError if it is
+    above tolerance. Slow, so run it from the REPL or the host rather than at boot.
+    """
+    worst = 0
+    for step in range(HUE_STEPS):
+        hue = step * 360 / HUE_STEPS
+        for value in range(256):
+            expected = hue_value_to_rgb(hue, value)
+            actual = hue_value_lookup(hue_table, step, value)
+            for c in range(3):
+                error = abs(expected[c] - actual[c])
+                if error > worst:
+                    worst = error
+    if worst > tolerance:
+        raise ValueError("Hue table differs from hue_value_to_rgb() by %d" % worst)
+    return worst